@@ -1,5 +1,6 @@
 import os
 import io
+import importlib.util
 import time
 import streamlit as st
 from dotenv import load_dotenv
@@ -9,13 +10,16 @@ from adaptive import compute_confidence_score, pick_next_question
 from scoring import deep_evaluate
 from voice import tts_speak, stt_from_file
 from reporter import generate_pdf_report
-from db import init_db, save_interview, save_answer, list_interviews
-from db import get_answers, get_interview, export_interviews_to_excel
+from db import enable_write_behind, SCORE_COLUMNS
+from storage import get_storage, SQLiteStorage
+import dashboard_data as dash
 import plotly.express as px
 import pandas as pd
 
 st.set_page_config(page_title="AI Interview Agent", layout="wide", initial_sidebar_state="expanded")
 
+DASHBOARD_PAGE_SIZE = 50
+
 # Inject custom CSS for 3D effects and responsive design
 def inject_custom_css():
     st.markdown("""
@@ -340,6 +344,20 @@ def inject_custom_css():
 
 inject_custom_css()
 
+
+@st.cache_resource
+def get_app_storage():
+    # One backend (and connection pool) per server process, shared across reruns and sessions
+    return get_storage()
+
+
+def speculate_answer():
+    # on_change hook for the answer box: start scoring the draft before it is submitted
+    agent = st.session_state.get("agent")
+    if agent is not None and agent.speculative:
+        agent.speculate(st.session_state.get("answer_input", ""))
+
+
 def main():
     # Main title with enhanced styling
     st.markdown("""
@@ -376,14 +394,28 @@ def main():
         persona = st.selectbox("Interviewer persona", personas)
         difficulty = st.selectbox("Starting difficulty", difficulty_levels, index=1)
         voice_mode = st.checkbox("Enable voice mode (TTS/STT)")
+        speculative_mode = st.checkbox("Speculative prefetch (score drafts before submit)")
+        stream_mode = st.checkbox("Stream interviewer responses", value=True)
+        combined_mode = st.checkbox("Single LLM call per answer (evaluation + follow-up)")
         model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
     if st.session_state.agent is None:
         # Read API key from environment only to avoid exposing it in the UI
         initial_key = os.getenv("OPENAI_API_KEY", None)
         st.session_state.agent = Interviewer(api_key=initial_key, model=model)
+    st.session_state.agent.speculative = speculative_mode
+    st.session_state.agent.combined = combined_mode
+    if speculative_mode:
+        spec = st.session_state.agent.speculation_stats()
+        total = spec['hits'] + spec['misses'] + spec['late']
+        st.sidebar.caption(f"Speculation hit rate: {spec['hit_rate']:.0%} ({spec['hits']}/{total}), "
+                           f"up to {spec['saved_seconds']:.1f}s head start")
 
-    init_db()
+    storage = get_app_storage()
+    storage.init_db()
+    if isinstance(storage, SQLiteStorage) and os.getenv("DB_WRITE_BEHIND", "").lower() in ("1", "true", "yes"):
+        # Keep SQLite commits out of the answer-submission path
+        enable_write_behind(storage.path)
 
     # Simple page router
     if st.session_state.get("page") == "dashboard":
@@ -394,23 +426,84 @@ def main():
             <p style="font-size: 1.2rem; color: #666;">Manage and analyze all interviews</p>
         </div>
         """, unsafe_allow_html=True)
-        ints = list_interviews()
-        if not ints:
+        # Filters and keyset pagination keep every rerun down to one page of rows
+        fcol1, fcol2, fcol3 = st.columns(3)
+        with fcol1:
+            f_role = st.selectbox("Role", ["All"] + roles, key="dash_role")
+        with fcol2:
+            f_persona = st.selectbox("Persona", ["All"] + personas, key="dash_persona")
+        with fcol3:
+            f_scores = st.slider("Score range", 0.0, 100.0, (0.0, 100.0), key="dash_scores")
+        filters = {
+            "role": None if f_role == "All" else f_role,
+            "persona": None if f_persona == "All" else f_persona,
+            "min_score": f_scores[0] if f_scores[0] > 0 else None,
+            "max_score": f_scores[1] if f_scores[1] < 100 else None,
+        }
+        if st.session_state.get("dash_filters") != filters:
+            st.session_state.dash_filters = filters
+            st.session_state.dash_cursors = [None]
+        cursors = st.session_state.dash_cursors
+        total = dash.count_interviews(storage, **filters)
+        ints = dash.query_interviews(storage, before_id=cursors[-1], limit=DASHBOARD_PAGE_SIZE, **filters)
+        if not total:
             st.info("No interviews recorded yet.")
         if st.button("🔙 Back to Interview", use_container_width=True, key="back_to_interview_1"):
             st.session_state.page = None
             st.rerun()
             return
 
-        df = pd.DataFrame(ints)
-        st.markdown("#### 📋 All Interviews")
-        st.dataframe(df[["id", "role", "persona", "total_score"]], use_container_width=True)
+        df = pd.DataFrame(ints, columns=["id", "role", "persona", "started_at", "ended_at", "total_score",
+                                         "decision", "duration"])
+        st.markdown(f"#### 📋 Interviews (page {len(cursors)}, {total} matching)")
+        st.dataframe(df[["id", "role", "persona", "total_score", "decision"]], use_container_width=True)
+        pcol1, pcol2 = st.columns(2)
+        with pcol1:
+            if len(cursors) > 1 and st.button("⬅️ Previous page", use_container_width=True):
+                cursors.pop()
+                st.rerun()
+        with pcol2:
+            if len(ints) == DASHBOARD_PAGE_SIZE and st.button("Next page ➡️", use_container_width=True):
+                cursors.append(ints[-1]["id"])
+                st.rerun()
+
+        if dash.analytics_available(storage):
+            with st.expander("📊 Score statistics by role"):
+                stats = dash.interview_stats(storage, persona=filters["persona"])
+                if stats:
+                    st.dataframe(pd.DataFrame(stats), use_container_width=True)
+                board_dim = st.selectbox("Leaderboard dimension", SCORE_COLUMNS, key="dash_board_dim")
+                board = dash.dimension_leaderboard(storage, board_dim, role=filters["role"])
+                if board:
+                    st.dataframe(pd.DataFrame(board), use_container_width=True)
+
+            with st.expander("📈 Daily trend"):
+                trend = dash.daily_summary(storage, role=filters["role"])
+                if trend:
+                    trend_df = pd.DataFrame(trend)
+                    st.plotly_chart(px.line(trend_df, x="day", y="avg_score", color="role", markers=True),
+                                    use_container_width=True)
+                    st.dataframe(trend_df, use_container_width=True)
+                else:
+                    st.info("No finalized interviews yet.")
+
+            st.markdown("#### 🔎 Search Answers")
+            search_q = st.text_input("Search past answers", key="dash_search", placeholder="e.g. Kubernetes")
+            if search_q.strip():
+                hits = dash.search_answers(storage, search_q, role=filters["role"], limit=20)
+                if not hits:
+                    st.info("No matching answers.")
+                for h in hits:
+                    st.markdown(f"**Interview {h['interview_id']}** · {h['role']} · score {h['score']}  \n"
+                                f"❓ {h['question']}  \n💬 {h['snippet']}")
+        else:
+            st.caption("Score statistics, daily trend and answer search are only available with the SQLite backend.")
 
         sel = st.selectbox("🔍 Select interview to inspect", options=[i["id"] for i in ints])
         if sel:
-            it = get_interview(sel)
+            it = dash.get_interview(storage, sel)
             st.markdown(f"### 📝 Interview {sel} - {it.get('role')} ({it.get('persona')})")
-            answers = get_answers(sel)
+            answers = dash.get_answers(storage, sel)
             for idx, a in enumerate(answers, 1):
                 st.markdown(f"""
                 <div style="background: rgba(255, 255, 255, 0.9); padding: 1.5rem; border-radius: 15px;
@@ -429,38 +522,38 @@ def main():
 
             # Generate a lightweight report from DB
             if st.button("📄 Generate PDF Report", use_container_width=True):
-                # Build report structure similar to interviewer.end_interview output
-                total = 0.0
-                breakdown_acc = {"relevance": 0.0, "technical_depth": 0.0, "clarity": 0.0, "structure": 0.0}
-                items = []
-                for a in answers:
-                    ev = a.get('metadata', {}).get('eval', {})
-                    score = ev.get('score', 0) if isinstance(ev, dict) else 0
-                    total += score
-                    bd = ev.get('breakdown', {}) if isinstance(ev, dict) else {}
-                    for k in breakdown_acc:
-                        breakdown_acc[k] += bd.get(k, 0)
-                    items.append({"question": a['question'], "answer": a['answer'], "evaluation": ev})
-                count = max(1, len(answers))
-                avg = total / count
-                breakdown_avg = {k: (v / count) for k, v in breakdown_acc.items()}
+                # Build report structure similar to interviewer.end_interview output; the
+                # averages come from the typed score columns instead of the JSON metadata
+                summary = dash.answer_score_summary(storage, sel)
+                avg = summary["avg_score"]
+                breakdown_avg = summary["breakdown_avg"]
+                items = [{"question": a['question'], "answer": a['answer'], "evaluation": a.get('metadata', {}).get('eval', {})}
+                         for a in answers]
                 decision = "Hire" if avg >= 75 else ("Consider" if avg >= 50 else "Reject")
                 report = {"role": it.get('role'), "total_score": avg, "breakdown_avg": breakdown_avg, "decision": decision, "items": items}
                 pdf_path = generate_pdf_report(report, out_path=f"interview_{sel}_report.pdf")
                 with open(pdf_path, "rb") as f:
                     st.download_button("Download PDF Report", data=f, file_name=f"interview_{sel}_report.pdf", mime="application/pdf")
 
-        # Export all interviews to excel
-        if st.button("📊 Export all interviews to Excel", use_container_width=True):
-            excel_path = export_interviews_to_excel()
-            with open(excel_path, "rb") as ef:
-                st.download_button("Download Excel", data=ef, file_name=excel_path, mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        # Export all interviews (streamed straight from SQLite to the file)
+        export_mimes = {"xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        "csv": "text/csv"}
+        if importlib.util.find_spec("pyarrow") is not None:
+            # Parquet export needs the optional pyarrow package
+            export_mimes["parquet"] = "application/octet-stream"
+        export_fmt = st.selectbox("Export format", list(export_mimes), key="export_fmt")
+        if st.button("📊 Export all interviews", use_container_width=True):
+            export_status = st.empty()
+            export_path = storage.export(f"interviews_export.{export_fmt}",
+                                         progress=lambda n: export_status.caption(f"Exported {n} rows..."))
+            with open(export_path, "rb") as ef:
+                st.download_button("Download export", data=ef, file_name=export_path, mime=export_mimes[export_fmt])
 
         st.markdown("---")
         st.markdown("### 📈 Compare Candidates")
         sel_multi = st.multiselect("Select interviews to compare", options=[i["id"] for i in ints])
         if sel_multi:
-            comp = [get_interview(i) for i in sel_multi]
+            comp = dash.get_interviews(storage, sel_multi)
             comp_df = pd.DataFrame(comp)
             fig = px.bar(comp_df, x="id", y="total_score", color="role", title="Candidate comparison by total score")
             st.plotly_chart(fig, use_container_width=True)
@@ -480,12 +573,15 @@ def main():
             st.session_state.metrics = {"confidence": 60, "missed_topics": []}
             st.session_state.persona = persona
             # create a DB entry placeholder
-            st.session_state.interview_id = save_interview(role, persona, 0.0)
+            st.session_state.interview_id = get_app_storage().save_interview(role, persona)
             st.rerun()
     with col2:
         if st.button("⏹️ End Interview", use_container_width=True):
             report = st.session_state.agent.end_interview()
             st.session_state.report = report
+            if st.session_state.interview_id:
+                get_app_storage().finalize_interview(st.session_state.interview_id, report["total_score"],
+                                                     report["decision"], report["breakdown_avg"])
             st.rerun()
     with col3:
         if st.button("📊 Open HR Dashboard", use_container_width=True):
@@ -579,21 +675,37 @@ def main():
                 with st.spinner("🎙️ Transcribing audio..."):
                     text_answer = stt_from_file(audio_file, api_key=os.getenv("OPENAI_API_KEY"))
                 st.text_area("📝 Transcription", value=text_answer, height=100)
-                user_input = st.text_area("✏️ Your answer (edit if needed)", value=text_answer, key="answer_input", height=150)
+                user_input = st.text_area("✏️ Your answer (edit if needed)", value=text_answer, key="answer_input", height=150, on_change=speculate_answer)
             else:
-                user_input = st.text_area("✏️ Your answer", key="answer_input", height=150)
+                user_input = st.text_area("✏️ Your answer", key="answer_input", height=150, on_change=speculate_answer)
         else:
-            user_input = st.text_area("✏️ Type your answer here...", key="answer_input", height=200)
+            user_input = st.text_area("✏️ Type your answer here...", key="answer_input", height=200, on_change=speculate_answer)
 
         if st.button("✅ Submit Answer", use_container_width=True):
             if not user_input.strip():
                 st.warning("Please enter an answer before submitting.")
             else:
                 with st.spinner("Evaluating..."):
-                    result = st.session_state.agent.receive_answer(user_input)
+                    # The agent appends the follow-up to history, so pair the answer with its question first
+                    last_q = st.session_state.agent._question_before(len(st.session_state.agent.history))
+                    if stream_mode:
+                        # Render the follow-up and the overall score progressively as tokens arrive
+                        follow_box = st.empty()
+                        score_box = st.empty()
+                        follow_text = ""
+                        result = None
+                        for event in st.session_state.agent.receive_answer_stream(user_input):
+                            if event["type"] == "followup_token":
+                                follow_text += event["text"]
+                                follow_box.markdown(f"**🤖 Interviewer:** {follow_text}▌")
+                            elif event["type"] == "evaluation" and "score" in event["data"]:
+                                score_box.metric("📊 Overall Score", f"{float(event['data']['score']):.1f}/100")
+                            elif event["type"] == "result":
+                                result = event["data"]
+                    else:
+                        result = st.session_state.agent.receive_answer(user_input)
                     st.session_state.last_eval = result
                     # deep evaluation
-                    last_q = st.session_state.agent.history[-2]["text"] if len(st.session_state.agent.history) >= 2 else ""
                     ideal = None
                     # try to find ideal from prompts
                     try:
@@ -612,7 +724,7 @@ def main():
                     st.session_state.metrics = {"confidence": conf, "missed_topics": []}
                     # save to DB
                     try:
-                        save_answer(st.session_state.interview_id, last_q, user_input, result.get("score", 0), metadata={"eval": result, "deep": deep})
+                        get_app_storage().save_answer(st.session_state.interview_id, last_q, user_input, result.get("score", 0), metadata={"eval": result, "deep": deep})
                     except Exception:
                         pass
 
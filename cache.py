@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+CACHE_PATH = os.getenv("AI_CACHE_PATH", "ai_cache.db")
+CACHE_MAX_DISK_ITEMS = int(os.getenv("AI_CACHE_MAX_DISK_ITEMS", "50000"))
+# The disk tier is pruned (expired rows, then oldest beyond the cap) every this many writes
+_PRUNE_EVERY = 100
+
+
+def make_key(*parts: Any) -> str:
+    """Build a content-addressed key from the given parts."""
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(str(p).encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class TieredCache:
+    """In-process LRU backed by an optional SQLite tier.
+
+    Entries older than ttl seconds are treated as misses in both tiers and deleted from
+    disk. The disk tier keeps at most max_disk_items entries per namespace, dropping the
+    oldest first. Pass path=None (or an empty string) to keep the cache in memory only.
+    """
+
+    def __init__(self, namespace: str, max_items: int = 1024, ttl: Optional[float] = None,
+                 path: Optional[str] = CACHE_PATH, encode: Callable[[Any], Any] = json.dumps,
+                 decode: Callable[[Any], Any] = json.loads, max_disk_items: int = CACHE_MAX_DISK_ITEMS):
+        self.namespace = namespace
+        self.max_items = max_items
+        self.max_disk_items = max_disk_items
+        self.ttl = ttl
+        self.path = path or None
+        self.encode = encode
+        self.decode = decode
+        self._lru: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._writes = 0
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT,
+                key TEXT,
+                value BLOB,
+                created_at REAL,
+                PRIMARY KEY (namespace, key)
+            )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_age ON cache_entries (namespace, created_at)")
+            conn.commit()
+            self._conn = conn
+            self._prune(conn)
+        return self._conn
+
+    def _prune(self, conn: sqlite3.Connection):
+        # Called with the lock held; commits its own deletes
+        deleted = 0
+        if self.ttl is not None:
+            deleted += conn.execute("DELETE FROM cache_entries WHERE namespace=? AND created_at < ?",
+                                    (self.namespace, time.time() - self.ttl)).rowcount
+        deleted += conn.execute("""
+            DELETE FROM cache_entries WHERE rowid IN (
+                SELECT rowid FROM cache_entries WHERE namespace=?
+                ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.namespace, max(0, self.max_disk_items))).rowcount
+        conn.commit()
+        self.evictions += deleted
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def _remember(self, key: str, value: Any, created_at: float):
+        self._lru[key] = (value, created_at)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._lru.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._lru[key]
+            try:
+                conn = self._disk()
+                row = None
+                if conn is not None:
+                    row = conn.execute("SELECT value, created_at FROM cache_entries WHERE namespace=? AND key=?",
+                                       (self.namespace, key)).fetchone()
+                if row and not self._expired(row[1]):
+                    value = self.decode(row[0])
+                    self._remember(key, value, row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return value
+                if row:
+                    conn.execute("DELETE FROM cache_entries WHERE namespace=? AND key=?", (self.namespace, key))
+                    conn.commit()
+                    self.evictions += 1
+            except Exception:
+                # A broken disk tier should never break the caller
+                pass
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            try:
+                conn = self._disk()
+                if conn is not None:
+                    conn.execute("INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at) VALUES (?,?,?,?)",
+                                 (self.namespace, key, self.encode(value), now))
+                    conn.commit()
+                    self._writes += 1
+                    if self._writes % _PRUNE_EVERY == 0:
+                        self._prune(conn)
+            except Exception:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            try:
+                conn = self._disk()
+                if conn is not None:
+                    conn.execute("DELETE FROM cache_entries WHERE namespace=?", (self.namespace,))
+                    conn.commit()
+            except Exception:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "size": len(self._lru),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,88 @@
+import os
+import asyncio
+import threading
+import weakref
+from typing import Dict, Optional, Tuple
+import httpx
+from openai import OpenAI, AsyncOpenAI
+
+
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "10"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+
+_lock = threading.Lock()
+_clients: Dict[Tuple, OpenAI] = {}
+# httpx async connections belong to the event loop that opened them, so async
+# clients are registered per loop and dropped together with it.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS,
+                        max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+                        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY)
+
+
+def _registry_key(api_key: Optional[str], base_url: Optional[str]) -> Tuple:
+    return (api_key or os.getenv("OPENAI_API_KEY"), base_url or os.getenv("OPENAI_BASE_URL"))
+
+
+def get_client(api_key: str = None, base_url: str = None) -> OpenAI:
+    """Return the process-wide OpenAI client for this key, creating it on first use.
+
+    The client keeps a pooled keep-alive HTTP connection, so repeated calls from the
+    evaluator, interviewer, scoring and voice modules reuse the same TLS session.
+    """
+    key = _registry_key(api_key, base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(api_key=key[0], base_url=key[1],
+                            http_client=httpx.Client(limits=_limits(), timeout=OPENAI_TIMEOUT))
+            _clients[key] = client
+        return client
+
+
+def get_async_client(api_key: str = None, base_url: str = None) -> AsyncOpenAI:
+    """Return the AsyncOpenAI client for this key on the running event loop."""
+    key = _registry_key(api_key, base_url)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get(key)
+        if client is None:
+            client = AsyncOpenAI(api_key=key[0], base_url=key[1],
+                                 http_client=httpx.AsyncClient(limits=_limits(), timeout=OPENAI_TIMEOUT))
+            per_loop[key] = client
+        return client
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro):
+    """Run a coroutine on the shared background event loop and wait for its result.
+
+    Reusing one long-lived loop keeps async clients (and their pooled connections)
+    alive across batches, and works even when the caller already runs a loop.
+    """
+    global _loop
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="openai-async-loop", daemon=True).start()
+        loop = _loop
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def close_clients():
+    """Close pooled sync connections (e.g. on shutdown or after rotating keys)."""
+    with _lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _clients.clear()
@@ -0,0 +1,127 @@
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import streamlit as st
+
+import db
+from storage import StorageBackend, SQLiteStorage
+
+
+# Upper bound on staleness for writes made by other processes (replicas, maintenance.py);
+# writes from this process invalidate immediately through the backend's generation().
+DASHBOARD_CACHE_TTL = float(os.getenv("DASHBOARD_CACHE_TTL", "300"))
+_cached = st.cache_data(ttl=DASHBOARD_CACHE_TTL, show_spinner=False, max_entries=1000)
+
+
+# The generation argument is part of every cache key, so any committed write makes all
+# earlier entries unreachable; they age out through the TTL and max_entries.
+# Leading-underscore arguments are not hashed by st.cache_data; the backend is
+# identified by the `backend` string from _key instead.
+
+@_cached
+def _count_interviews(generation: int, backend: str, role, persona, min_score, max_score,
+                      _storage: StorageBackend) -> int:
+    return _storage.count_interviews(role, persona, min_score, max_score)
+
+
+@_cached
+def _query_interviews(generation: int, backend: str, role, persona, min_score, max_score, before_id, limit,
+                      _storage: StorageBackend) -> List[Dict[str, Any]]:
+    return _storage.query_interviews(role, persona, min_score, max_score, before_id=before_id, limit=limit)
+
+
+@_cached
+def _get_interview(generation: int, backend: str, interview_id: int, _storage: StorageBackend) -> Optional[Dict]:
+    return _storage.get_interview(interview_id)
+
+
+@_cached
+def _get_interviews(generation: int, backend: str, ids: tuple, _storage: StorageBackend) -> List[Dict[str, Any]]:
+    return _storage.get_interviews(list(ids))
+
+
+@_cached
+def _get_answers(generation: int, backend: str, interview_id: int, _storage: StorageBackend) -> List[Dict]:
+    return _storage.get_answers(interview_id)
+
+
+@_cached
+def _answer_score_summary(generation: int, backend: str, interview_id: int,
+                          _storage: StorageBackend) -> Dict[str, Any]:
+    return _storage.answer_score_summary(interview_id)
+
+
+# Analytics below use SQLite-specific SQL (FTS5, the daily summary upsert, percentile
+# lookups) and are keyed by the database path.
+
+@_cached
+def _interview_stats(generation: int, path: str, persona) -> List[Dict[str, Any]]:
+    return db.interview_stats(persona=persona, path=path)
+
+
+@_cached
+def _dimension_leaderboard(generation: int, path: str, dimension: str, role) -> List[Dict[str, Any]]:
+    return db.dimension_leaderboard(dimension, role=role, path=path)
+
+
+@_cached
+def _daily_summary(generation: int, path: str, role) -> List[Dict[str, Any]]:
+    return db.daily_summary(role=role, path=path)
+
+
+@_cached
+def _search_answers(generation: int, path: str, query: str, role, limit: int) -> List[Dict[str, Any]]:
+    return db.search_answers(query, role=role, limit=limit, path=path)
+
+
+def _key(storage: StorageBackend) -> tuple:
+    # File-backed stores are told apart by path; other backends by the instance, which
+    # lives for the whole process (app.get_app_storage is a cached resource)
+    return storage.generation(), f"{type(storage).__name__}:{getattr(storage, 'path', None) or id(storage)}"
+
+
+def count_interviews(storage: StorageBackend, role: str = None, persona: str = None, min_score: float = None,
+                     max_score: float = None) -> int:
+    return _count_interviews(*_key(storage), role, persona, min_score, max_score, storage)
+
+
+def query_interviews(storage: StorageBackend, role: str = None, persona: str = None, min_score: float = None,
+                     max_score: float = None, before_id: int = None, limit: int = 50) -> List[Dict[str, Any]]:
+    return _query_interviews(*_key(storage), role, persona, min_score, max_score, before_id, limit, storage)
+
+
+def get_interview(storage: StorageBackend, interview_id: int) -> Optional[Dict[str, Any]]:
+    return _get_interview(*_key(storage), interview_id, storage)
+
+
+def get_interviews(storage: StorageBackend, ids: Sequence[int]) -> List[Dict[str, Any]]:
+    return _get_interviews(*_key(storage), tuple(ids), storage)
+
+
+def get_answers(storage: StorageBackend, interview_id: int) -> List[Dict[str, Any]]:
+    return _get_answers(*_key(storage), interview_id, storage)
+
+
+def answer_score_summary(storage: StorageBackend, interview_id: int) -> Dict[str, Any]:
+    return _answer_score_summary(*_key(storage), interview_id, storage)
+
+
+def analytics_available(storage: StorageBackend) -> bool:
+    """Whether the SQLite-only analytics below can run against this backend."""
+    return isinstance(storage, SQLiteStorage)
+
+
+def interview_stats(storage: SQLiteStorage, persona: str = None) -> List[Dict[str, Any]]:
+    return _interview_stats(storage.generation(), storage.path, persona)
+
+
+def dimension_leaderboard(storage: SQLiteStorage, dimension: str, role: str = None) -> List[Dict[str, Any]]:
+    return _dimension_leaderboard(storage.generation(), storage.path, dimension, role)
+
+
+def daily_summary(storage: SQLiteStorage, role: str = None) -> List[Dict[str, Any]]:
+    return _daily_summary(storage.generation(), storage.path, role)
+
+
+def search_answers(storage: SQLiteStorage, query: str, role: str = None, limit: int = 20) -> List[Dict[str, Any]]:
+    return _search_answers(storage.generation(), storage.path, query.strip(), role, limit)
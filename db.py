@@ -1,15 +1,136 @@
+import os
+import queue
+import atexit
 import sqlite3
-from typing import Optional, Dict, Any, List
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional, Dict, Any, Iterable, Iterator, List, Sequence, Tuple
 import time
 import json
+import uuid
+import logging
+from collections import deque
 
 
 DB_PATH = "ai_interviews.db"
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+# Page cache per connection in KiB (passed to PRAGMA cache_size as a negative number)
+DB_CACHE_SIZE_KIB = int(os.getenv("DB_CACHE_SIZE_KIB", "20000"))
 
+DB_FLUSH_INTERVAL = float(os.getenv("DB_FLUSH_INTERVAL", "0.5"))
+DB_BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "100"))
+# Longest a reader waits for queued answers to be committed before reading anyway
+DB_FLUSH_TIMEOUT = float(os.getenv("DB_FLUSH_TIMEOUT", "10"))
 
-def init_db(path: str = DB_PATH):
-    conn = sqlite3.connect(path)
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+# Bumped after every committed write; read caches (e.g. the dashboard) key on it
+_generations: Dict[str, int] = {}
+_generations_lock = threading.Lock()
+
+
+def data_generation(path: str = DB_PATH) -> int:
+    """Counter that changes whenever this process commits a write to `path`."""
+    return _generations.get(path, 0)
+
+
+def bump_generation(path: str = DB_PATH):
+    with _generations_lock:
+        _generations[path] = _generations.get(path, 0) + 1
+
+
+def get_connection(path: str = DB_PATH) -> sqlite3.Connection:
+    """Return this thread's connection for `path`, opening and tuning it on first use.
+
+    Connections run in WAL mode so readers do not block the writer, wait up to
+    DB_BUSY_TIMEOUT_MS on locks instead of failing, and use synchronous=NORMAL,
+    which is durable across application crashes in WAL mode. New files are created with
+    auto_vacuum=INCREMENTAL so maintenance.py can return free pages without a full VACUUM.
+    """
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        conn = sqlite3.connect(path, timeout=DB_BUSY_TIMEOUT_MS / 1000.0)
+        # Only takes effect before the file header is written (i.e. for a new file), so it
+        # must precede journal_mode; existing files keep their mode until a full VACUUM
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KIB}")
+        conns[path] = conn
+    return conn
+
+
+@contextmanager
+def transaction(path: str = DB_PATH) -> Iterator[sqlite3.Cursor]:
+    """Run the block in a single transaction: commit on success, roll back on error."""
+    conn = get_connection(path)
     cur = conn.cursor()
+    try:
+        yield cur
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+
+def close_connections():
+    """Close the calling thread's cached connections."""
+    conns = getattr(_local, "conns", None) or {}
+    for conn in conns.values():
+        try:
+            conn.close()
+        except Exception:
+            pass
+    conns.clear()
+
+
+def init_db(path: str = DB_PATH):
+    migrate(path)
+
+
+def schema_version(path: str = DB_PATH) -> int:
+    return get_connection(path).execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(path: str = DB_PATH) -> int:
+    """Bring the database at `path` up to the latest schema version, in place.
+
+    The version lives in PRAGMA user_version. Each pending migration runs in its own
+    IMMEDIATE transaction together with the version bump, so concurrent app processes
+    cannot apply the same step twice and a failed step leaves the file untouched.
+    """
+    return _migrate_connection(get_connection(path))
+
+
+def _migrate_connection(conn: sqlite3.Connection) -> int:
+    # Also used by storage.PooledSQLStorage for its SQLite connections
+    def version() -> int:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+    while version() < len(MIGRATIONS):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = version()
+            if current < len(MIGRATIONS):
+                cur = conn.cursor()
+                MIGRATIONS[current](cur)
+                cur.execute(f"PRAGMA user_version={current + 1}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return version()
+
+
+def _create_tables(cur: sqlite3.Cursor):
     cur.execute("""
     CREATE TABLE IF NOT EXISTS interviews (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -31,78 +152,927 @@ def init_db(path: str = DB_PATH):
         timestamp REAL
     )
     """)
-    conn.commit()
-    conn.close()
 
 
-def save_interview(role: str, persona: str, total_score: float, path: str = DB_PATH) -> int:
-    conn = sqlite3.connect(path)
-    cur = conn.cursor()
+def _add_indexes(cur: sqlite3.Cursor):
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_answers_interview ON answers (interview_id, id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_interviews_role ON interviews (role)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_interviews_started ON interviews (started_at)")
+
+
+def _add_score_index(cur: sqlite3.Cursor):
+    # Serves per-role score aggregates and percentile lookups without touching the table
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_interviews_role_score ON interviews (role, total_score)")
+
+
+def _has_fts5(cur: sqlite3.Cursor) -> bool:
+    try:
+        cur.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x)")
+        cur.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _add_answer_search(cur: sqlite3.Cursor):
+    """Full-text index over answers.question/answers.answer, kept in sync by triggers.
+
+    Uses an external-content FTS5 table so the text is not stored twice. SQLite builds
+    without FTS5 skip this step and search_answers falls back to LIKE matching.
+    """
+    if not _has_fts5(cur):
+        return
+    cur.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS answers_fts USING fts5(
+        question, answer, content='answers', content_rowid='id', tokenize='porter unicode61'
+    )
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS answers_fts_ai AFTER INSERT ON answers BEGIN
+        INSERT INTO answers_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS answers_fts_ad AFTER DELETE ON answers BEGIN
+        INSERT INTO answers_fts (answers_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+    END
+    """)
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS answers_fts_au AFTER UPDATE OF question, answer ON answers BEGIN
+        INSERT INTO answers_fts (answers_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+        INSERT INTO answers_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+    END
+    """)
+    # Backfill rows that existed before the index
+    cur.execute("INSERT INTO answers_fts (answers_fts) VALUES ('rebuild')")
+
+
+# Evaluation fields stored in typed answer columns so they can be aggregated in SQL
+EVAL_DIMENSIONS = ("relevance", "technical_depth", "clarity", "structure")
+DEEP_METRICS = ("grammar_quality", "logical_reasoning", "explanation_depth", "consistency")
+SCORE_COLUMNS = EVAL_DIMENSIONS + DEEP_METRICS
+
+
+def _add_score_columns(cur: sqlite3.Cursor):
+    existing = {r[1] for r in cur.execute("PRAGMA table_info(answers)").fetchall()}
+    for col in SCORE_COLUMNS:
+        if col not in existing:
+            cur.execute(f"ALTER TABLE answers ADD COLUMN {col} REAL")
+    if "recommendation" not in existing:
+        cur.execute("ALTER TABLE answers ADD COLUMN recommendation TEXT")
+    # Backfill from the JSON metadata written by earlier versions, keeping only the value
+    # types _num and _text accept for new rows
+    def number(p):
+        return (f"CASE WHEN json_type(metadata, '{p}') IN ('integer', 'real') "
+                f"THEN json_extract(metadata, '{p}') END")
+
+    sets = [f"{c} = {number(f'$.eval.breakdown.{c}')}" for c in EVAL_DIMENSIONS]
+    sets += [f"{c} = {number(f'$.deep.{c}')}" for c in DEEP_METRICS]
+    p = "$.eval.recommendation"
+    sets.append(f"recommendation = CASE WHEN json_type(metadata, '{p}') IN ('text', 'integer', 'real') "
+                f"THEN CAST(json_extract(metadata, '{p}') AS TEXT) END")
+    cur.execute(f"UPDATE answers SET {', '.join(sets)} WHERE json_valid(metadata)")
+
+
+def _add_interview_summary(cur: sqlite3.Cursor):
+    existing = {r[1] for r in cur.execute("PRAGMA table_info(interviews)").fetchall()}
+    for col, typ in [("decision", "TEXT"), ("duration", "REAL")] + [(f"{c}_avg", "REAL") for c in EVAL_DIMENSIONS]:
+        if col not in existing:
+            cur.execute(f"ALTER TABLE interviews ADD COLUMN {col} {typ}")
+    # One row per role and (UTC) day of finalization, maintained by finalize_interview
+    sums = ",\n        ".join(f"{c}_sum REAL NOT NULL DEFAULT 0" for c in EVAL_DIMENSIONS)
+    cur.execute(f"""
+    CREATE TABLE IF NOT EXISTS interview_daily_summary (
+        role TEXT NOT NULL,
+        day TEXT NOT NULL,
+        interviews INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        hire INTEGER NOT NULL DEFAULT 0,
+        consider INTEGER NOT NULL DEFAULT 0,
+        reject INTEGER NOT NULL DEFAULT 0,
+        duration_sum REAL NOT NULL DEFAULT 0,
+        {sums},
+        PRIMARY KEY (role, day)
+    )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_daily_summary_day ON interview_daily_summary (day)")
+
+
+def _clear_unscored_totals(cur: sqlite3.Cursor):
+    # Interviews used to be created with a placeholder score of 0; only finalized ones have a real total
+    cur.execute("UPDATE interviews SET total_score = NULL WHERE decision IS NULL")
+
+
+def _clear_invalid_scores(cur: sqlite3.Cursor):
+    # Older builds of _add_score_columns copied JSON values of any type into the typed columns
+    for c in SCORE_COLUMNS:
+        cur.execute(f"UPDATE answers SET {c} = NULL WHERE typeof({c}) NOT IN ('integer', 'real', 'null')")
+    cur.execute("UPDATE answers SET recommendation = NULL WHERE json_valid(recommendation) "
+                "AND json_type(recommendation) IN ('array', 'object')")
+
+
+# Schema migrations in order; MIGRATIONS[n] upgrades a database from user_version n to n + 1.
+# Databases created before versioning report version 0 and pick up every step, which is
+# why the steps are written to be idempotent. Only ever append to this list.
+MIGRATIONS: List[Callable[[sqlite3.Cursor], None]] = [
+    _create_tables,
+    _add_indexes,
+    _add_score_index,
+    _add_answer_search,
+    _add_score_columns,
+    _add_interview_summary,
+    _clear_unscored_totals,
+    _clear_invalid_scores,
+]
+
+
+def save_interview(role: str, persona: str, total_score: Optional[float] = None, path: str = DB_PATH) -> int:
     started = time.time()
-    cur.execute("INSERT INTO interviews (role, persona, started_at, ended_at, total_score) VALUES (?,?,?,?,?)",
-                (role, persona, started, time.time(), total_score))
-    iid = cur.lastrowid
-    conn.commit()
-    conn.close()
-    return iid
+    with transaction(path) as cur:
+        # ended_at stays empty until finalize_interview records the real end time
+        cur.execute("INSERT INTO interviews (role, persona, started_at, ended_at, total_score) VALUES (?,?,?,?,?)",
+                    (role, persona, started, None, total_score))
+        interview_id = cur.lastrowid
+    bump_generation(path)
+    return interview_id
+
+
+def decision_for(score: float) -> str:
+    if score >= 75:
+        return "Hire"
+    if score >= 50:
+        return "Consider"
+    return "Reject"
+
+
+def _summary_day(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(ts))
+
+
+_SUMMARY_FIELDS = (("role", "day", "interviews", "score_sum", "hire", "consider", "reject", "duration_sum")
+                   + tuple(f"{c}_sum" for c in EVAL_DIMENSIONS))
+_SUMMARY_UPSERT = (f"INSERT INTO interview_daily_summary ({', '.join(_SUMMARY_FIELDS)}) "
+                   f"VALUES ({','.join('?' * len(_SUMMARY_FIELDS))}) "
+                   f"ON CONFLICT (role, day) DO UPDATE SET "
+                   + ", ".join(f"{c} = interview_daily_summary.{c} + excluded.{c}" for c in _SUMMARY_FIELDS[2:]))
+_FINALIZE_SELECT = ("SELECT role, started_at, ended_at, total_score, decision, duration, "
+                    + ", ".join(f"{c}_avg" for c in EVAL_DIMENSIONS) + " FROM interviews WHERE id=?")
+_FINALIZE_UPDATE = ("UPDATE interviews SET ended_at=?, total_score=?, decision=?, duration=?, "
+                    + ", ".join(f"{c}_avg=?" for c in EVAL_DIMENSIONS) + " WHERE id=?")
+
+
+def _summary_values(role: Optional[str], day: str, score: float, decision: str, duration: Optional[float],
+                    breakdown: Dict[str, float], sign: int) -> list:
+    """Row for _SUMMARY_UPSERT that adds (sign=1) or retracts (sign=-1) one finalized interview."""
+    values = [role or "", day, sign, sign * (score or 0.0), sign * (decision == "Hire"),
+              sign * (decision == "Consider"), sign * (decision == "Reject"), sign * (duration or 0.0)]
+    return values + [sign * (breakdown.get(c) or 0.0) for c in EVAL_DIMENSIONS]
+
+
+def _finalize(cur, interview_id: int, total_score: float, decision: Optional[str],
+              breakdown_avg: Optional[Dict[str, float]], ended_at: Optional[float],
+              sql: Callable[[str], str] = lambda q: q) -> Dict[str, Any]:
+    # Shared by finalize_interview and the pooled storage backend; sql() adapts placeholders
+    ended_at = ended_at or time.time()
+    decision = decision or decision_for(total_score)
+    breakdown_avg = breakdown_avg or {}
+    cur.execute(sql(_FINALIZE_SELECT), (interview_id,))
+    row = cur.fetchone()
+    if row is None:
+        raise ValueError(f"Interview {interview_id} does not exist")
+    role, started_at, old_end, old_score, old_decision, old_duration = row[:6]
+    if old_decision is not None and old_end is not None:
+        cur.execute(sql(_SUMMARY_UPSERT), _summary_values(role, _summary_day(old_end), old_score, old_decision,
+                                                          old_duration, dict(zip(EVAL_DIMENSIONS, row[6:])), -1))
+    duration = (ended_at - started_at) if started_at else None
+    cur.execute(sql(_FINALIZE_UPDATE), [ended_at, total_score, decision, duration]
+                + [breakdown_avg.get(c) for c in EVAL_DIMENSIONS] + [interview_id])
+    cur.execute(sql(_SUMMARY_UPSERT), _summary_values(role, _summary_day(ended_at), total_score, decision,
+                                                      duration, breakdown_avg, 1))
+    return {"id": interview_id, "ended_at": ended_at, "total_score": total_score, "decision": decision,
+            "duration": duration}
+
+
+def finalize_interview(interview_id: int, total_score: float, decision: str = None,
+                       breakdown_avg: Dict[str, float] = None, ended_at: float = None,
+                       path: str = DB_PATH) -> Dict[str, Any]:
+    """Record the final score, decision, breakdown averages, end time and duration of an interview.
+
+    Also folds the interview into interview_daily_summary in the same transaction.
+    Finalizing again (e.g. after re-scoring) first retracts the previous contribution,
+    so the summary never double-counts.
+    """
+    with transaction(path) as cur:
+        result = _finalize(cur, interview_id, total_score, decision, breakdown_avg, ended_at)
+    bump_generation(path)
+    return result
+
+
+def daily_summary(role: str = None, start_day: str = None, end_day: str = None,
+                  path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Precomputed per-role, per-day analytics (days are UTC 'YYYY-MM-DD', inclusive)."""
+    clauses, params = ["interviews > 0"], []
+    for clause, value in (("role = ?", role), ("day >= ?", start_day), ("day <= ?", end_day)):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    sum_cols = ", ".join(f"{c}_sum" for c in EVAL_DIMENSIONS)
+    rows = get_connection(path).execute(f"""
+        SELECT role, day, interviews, score_sum, hire, consider, reject, duration_sum, {sum_cols}
+        FROM interview_daily_summary WHERE {" AND ".join(clauses)} ORDER BY day, role
+    """, params).fetchall()
+    out = []
+    for r in rows:
+        n = r[2]
+        item = {"role": r[0], "day": r[1], "interviews": n, "avg_score": r[3] / n, "hire": r[4],
+                "consider": r[5], "reject": r[6], "avg_duration": r[7] / n}
+        item.update({f"{c}_avg": v / n for c, v in zip(EVAL_DIMENSIONS, r[8:])})
+        out.append(item)
+    return out
+
+
+_ANSWER_FIELDS = ("interview_id", "question", "answer", "score", "metadata", "timestamp") + SCORE_COLUMNS + ("recommendation",)
+_INSERT_ANSWER = (f"INSERT INTO answers ({', '.join(_ANSWER_FIELDS)}) "
+                  f"VALUES ({','.join('?' * len(_ANSWER_FIELDS))})")
+
+
+def _num(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _text(value) -> Optional[str]:
+    # LLM output is untrusted: only scalars are stored in text columns
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return None
+    return str(value)
+
+
+def _answer_row(interview_id: int, question: str, answer: str, score: float, metadata: Dict = None) -> tuple:
+    """Build an answers row, lifting eval/deep fields out of metadata into typed columns."""
+    metadata = metadata or {}
+    ev = metadata.get("eval") if isinstance(metadata.get("eval"), dict) else {}
+    breakdown = ev.get("breakdown") if isinstance(ev.get("breakdown"), dict) else {}
+    deep = metadata.get("deep") if isinstance(metadata.get("deep"), dict) else {}
+    return ((interview_id, question, answer, score, json.dumps(metadata), time.time())
+            + tuple(_num(breakdown.get(c)) for c in EVAL_DIMENSIONS)
+            + tuple(_num(deep.get(c)) for c in DEEP_METRICS)
+            + (_text(ev.get("recommendation")),))
 
 
 def save_answer(interview_id: int, question: str, answer: str, score: float, metadata: Dict = None, path: str = DB_PATH):
-    conn = sqlite3.connect(path)
-    cur = conn.cursor()
-    cur.execute("INSERT INTO answers (interview_id, question, answer, score, metadata, timestamp) VALUES (?,?,?,?,?,?)",
-                (interview_id, question, answer, score, json.dumps(metadata or {}), time.time()))
-    conn.commit()
-    conn.close()
+    row = _answer_row(interview_id, question, answer, score, metadata)
+    writer = _writers.get(path)
+    if writer is not None:
+        # Write-behind: the background writer commits it with the next batch
+        writer.submit(row)
+        return
+    with transaction(path) as cur:
+        cur.execute(_INSERT_ANSWER, row)
+    bump_generation(path)
+
+
+_STOP = object()
+
+
+class WriteBehindWriter:
+    """Background thread that drains queued answer rows into batched transactions.
+
+    A batch is committed once batch_size rows are queued or flush_interval seconds after
+    its first row, whichever comes first, so one fsync covers many concurrent submits.
+    Pending rows are flushed on close(), which also runs at interpreter exit.
+    """
+
+    def __init__(self, path: str = DB_PATH, flush_interval: float = DB_FLUSH_INTERVAL,
+                 batch_size: int = DB_BATCH_SIZE):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.failed_rows = 0
+        # Rows that could not be written, kept for inspection or replay (the newest 1000)
+        self.dead_letters: "deque[tuple]" = deque(maxlen=1000)
+        self.last_error: Optional[BaseException] = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"db-writer:{path}", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row: tuple):
+        if self._closed:
+            raise RuntimeError("write-behind writer is closed")
+        with self._cond:
+            self._pending += 1
+        self._queue.put(row)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until every submitted row is committed; False if the timeout expired.
+
+        Returns False straight away if the writer thread is no longer running.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending == 0 or not self._thread.is_alive(), timeout)
+            return self._pending == 0
+
+    def close(self, timeout: float = 30.0):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+        # Drain anything submitted right before close()
+        rest = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rest.append(item)
+        if rest:
+            self._write(rest)
+        close_connections()
+
+    def _write(self, batch: List[tuple]):
+        try:
+            for attempt in range(3):
+                try:
+                    with transaction(self.path) as cur:
+                        cur.executemany(_INSERT_ANSWER, batch)
+                    bump_generation(self.path)
+                    break
+                except sqlite3.OperationalError as e:
+                    # Locked/busy database: retry the whole batch
+                    self.last_error = e
+                    time.sleep(0.1 * (attempt + 1))
+                except sqlite3.Error as e:
+                    # A bad row fails the whole executemany; write one by one so only it is lost
+                    self.last_error = e
+                    self._write_rows(batch)
+                    break
+            else:
+                self._dead_letter(batch, self.last_error)
+        finally:
+            with self._cond:
+                self._pending -= len(batch)
+                self._cond.notify_all()
+
+    def _write_rows(self, batch: List[tuple]):
+        written = 0
+        for row in batch:
+            try:
+                with transaction(self.path) as cur:
+                    cur.execute(_INSERT_ANSWER, row)
+                written += 1
+            except sqlite3.Error as e:
+                self.last_error = e
+                self._dead_letter([row], e)
+        if written:
+            bump_generation(self.path)
+
+    def _dead_letter(self, rows: List[tuple], error: Optional[BaseException]):
+        self.failed_rows += len(rows)
+        self.dead_letters.extend(rows)
+        logger.error("write-behind: dropped %d answer row(s) for %s: %s", len(rows), self.path, error)
+
+
+_writers: Dict[str, WriteBehindWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def enable_write_behind(path: str = DB_PATH, flush_interval: float = DB_FLUSH_INTERVAL,
+                        batch_size: int = DB_BATCH_SIZE) -> WriteBehindWriter:
+    """Route save_answer for `path` through a background batching writer (idempotent)."""
+    with _writers_lock:
+        writer = _writers.get(path)
+        if writer is None:
+            writer = _writers[path] = WriteBehindWriter(path, flush_interval, batch_size)
+        return writer
+
+
+def disable_write_behind(path: str = DB_PATH):
+    """Flush and stop the background writer for `path`; save_answer becomes synchronous again."""
+    with _writers_lock:
+        writer = _writers.pop(path, None)
+    if writer is not None:
+        writer.close()
+
+
+def _flush_writes(path: str):
+    # Read-your-writes: make queued answers visible before reading them back
+    writer = _writers.get(path)
+    if writer is not None and writer.pending:
+        writer.flush(DB_FLUSH_TIMEOUT)
+
+
+_INTERVIEW_COLUMNS = "id, role, persona, started_at, ended_at, total_score, decision, duration"
+
+
+def _interview_dict(r: tuple) -> Dict[str, Any]:
+    return dict(id=r[0], role=r[1], persona=r[2], started_at=r[3], ended_at=r[4], total_score=r[5],
+                decision=r[6], duration=r[7])
 
 
 def list_interviews(path: str = DB_PATH) -> List[Dict[str, Any]]:
-    conn = sqlite3.connect(path)
-    cur = conn.cursor()
-    cur.execute("SELECT id, role, persona, started_at, ended_at, total_score FROM interviews ORDER BY id DESC")
-    rows = cur.fetchall()
-    conn.close()
-    return [dict(id=r[0], role=r[1], persona=r[2], started_at=r[3], ended_at=r[4], total_score=r[5]) for r in rows]
+    rows = get_connection(path).execute(
+        f"SELECT {_INTERVIEW_COLUMNS} FROM interviews ORDER BY id DESC").fetchall()
+    return [_interview_dict(r) for r in rows]
+
+
+def _interview_filters(role: str = None, persona: str = None, min_score: float = None, max_score: float = None,
+                       started_after: float = None, started_before: float = None) -> Tuple[str, list]:
+    clauses, params = [], []
+    for clause, value in (("role = ?", role), ("persona = ?", persona),
+                          ("total_score >= ?", min_score), ("total_score <= ?", max_score),
+                          ("started_at >= ?", started_after), ("started_at < ?", started_before)):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    return (" AND ".join(clauses) or "1=1"), params
+
+
+def _page_query(role: str = None, persona: str = None, min_score: float = None, max_score: float = None,
+                started_after: float = None, started_before: float = None, before_id: int = None,
+                limit: int = 50) -> Tuple[str, list]:
+    where, params = _interview_filters(role, persona, min_score, max_score, started_after, started_before)
+    if before_id is not None:
+        where += " AND id < ?"
+        params.append(before_id)
+    return (f"SELECT {_INTERVIEW_COLUMNS} FROM interviews WHERE {where} ORDER BY id DESC LIMIT ?",
+            params + [limit])
+
+
+def query_interviews(role: str = None, persona: str = None, min_score: float = None, max_score: float = None,
+                     started_after: float = None, started_before: float = None, before_id: int = None,
+                     limit: int = 50, path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Return one page of interviews, newest first, matching the given filters.
+
+    Pagination is keyset-based: pass the id of the last row of the previous page as
+    before_id to get the next page. Cost stays constant however deep the page is.
+    """
+    query, params = _page_query(role, persona, min_score, max_score, started_after, started_before, before_id, limit)
+    return [_interview_dict(r) for r in get_connection(path).execute(query, params).fetchall()]
+
+
+def count_interviews(role: str = None, persona: str = None, min_score: float = None, max_score: float = None,
+                     started_after: float = None, started_before: float = None, path: str = DB_PATH) -> int:
+    where, params = _interview_filters(role, persona, min_score, max_score, started_after, started_before)
+    return get_connection(path).execute(f"SELECT COUNT(*) FROM interviews WHERE {where}", params).fetchone()[0]
+
+
+def get_interviews(ids: Sequence[int], path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Bulk counterpart of get_interview; results follow the order of `ids`, missing ids are skipped."""
+    conn = get_connection(path)
+    return _get_interviews(lambda query, chunk: conn.execute(query, chunk).fetchall(), ids)
+
+
+def _get_interviews(fetch: Callable[[str, list], Iterable[tuple]], ids: Sequence[int]) -> List[Dict[str, Any]]:
+    found: Dict[int, Dict[str, Any]] = {}
+    ids = list(ids)
+    # Stay under SQLite's bound-parameter limit on older builds
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        marks = ",".join("?" * len(chunk))
+        for r in fetch(f"SELECT {_INTERVIEW_COLUMNS} FROM interviews WHERE id IN ({marks})", chunk):
+            found[r[0]] = _interview_dict(r)
+    return [found[i] for i in ids if i in found]
+
+
+def interview_stats(persona: str = None, started_after: float = None, started_before: float = None,
+                    percentiles: Sequence[float] = (0.5, 0.9), path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Per-role aggregates computed in SQL: count, scored count, average/min/max score and percentiles.
+
+    Percentiles use the nearest-rank method over scored interviews and are looked up
+    through the (role, total_score) index rather than by loading scores into Python.
+    """
+    where, params = _interview_filters(persona=persona, started_after=started_after, started_before=started_before)
+    conn = get_connection(path)
+    rows = conn.execute(f"""
+        SELECT role, COUNT(*), COUNT(total_score), AVG(total_score), MIN(total_score), MAX(total_score)
+        FROM interviews WHERE {where} GROUP BY role ORDER BY role
+    """, params).fetchall()
+    out = []
+    for role, count, scored, avg, lo, hi in rows:
+        stats = {"role": role, "count": count, "scored": scored, "avg_score": avg, "min_score": lo, "max_score": hi}
+        for p in percentiles:
+            value = None
+            if scored:
+                offset = int(round(p * (scored - 1)))
+                row = conn.execute(f"""
+                    SELECT total_score FROM interviews
+                    WHERE {where} AND role IS ? AND total_score IS NOT NULL
+                    ORDER BY total_score LIMIT 1 OFFSET ?
+                """, params + [role, offset]).fetchone()
+                value = row[0] if row else None
+            stats[f"p{int(round(p * 100))}"] = value
+        out.append(stats)
+    return out
+
+
+def rebuild_search_index(path: str = DB_PATH) -> bool:
+    """Create the answer search index if needed and rebuild it from the answers table.
+
+    Returns False when this SQLite build has no FTS5 support.
+    """
+    init_db(path)
+    with transaction(path) as cur:
+        if not _has_fts5(cur):
+            return False
+        _add_answer_search(cur)
+    return True
+
+
+def _has_search_index(path: str) -> bool:
+    return get_connection(path).execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='answers_fts'").fetchone() is not None
+
+
+def _fts_query(text: str) -> str:
+    # Quote every term so user input cannot trip FTS5 query syntax; terms are ANDed
+    return " ".join('"' + t.replace('"', '""') + '"' for t in text.split())
+
+
+def search_answers(query: str, role: str = None, limit: int = 20, offset: int = 0, raw: bool = False,
+                   path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Full-text search over stored questions and answers, best matches first.
+
+    Each hit carries the answer/interview ids, role, persona, question, score and a
+    snippet of the answer with matches wrapped in ** for markdown. Pass raw=True to use
+    FTS5 query syntax (OR, NEAR, prefix*) directly.
+    """
+    match = query if raw else _fts_query(query)
+    if not match:
+        return []
+    _flush_writes(path)
+    role_clause = " AND i.role = ?" if role else ""
+    role_params = [role] if role else []
+    conn = get_connection(path)
+    if _has_search_index(path):
+        rows = conn.execute(f"""
+            SELECT a.id, a.interview_id, i.role, i.persona, a.question,
+                   snippet(answers_fts, 1, '**', '**', '…', 16), a.score, bm25(answers_fts) AS rank
+            FROM answers_fts
+            JOIN answers a ON a.id = answers_fts.rowid
+            JOIN interviews i ON i.id = a.interview_id
+            WHERE answers_fts MATCH ?{role_clause}
+            ORDER BY rank LIMIT ? OFFSET ?
+        """, [match] + role_params + [limit, offset]).fetchall()
+    else:
+        like = f"%{query}%"
+        rows = conn.execute(f"""
+            SELECT a.id, a.interview_id, i.role, i.persona, a.question, substr(a.answer, 1, 200), a.score, 0
+            FROM answers a JOIN interviews i ON i.id = a.interview_id
+            WHERE (a.question LIKE ? OR a.answer LIKE ?){role_clause}
+            ORDER BY a.id DESC LIMIT ? OFFSET ?
+        """, [like, like] + role_params + [limit, offset]).fetchall()
+    return [{"answer_id": r[0], "interview_id": r[1], "role": r[2], "persona": r[3], "question": r[4],
+             "snippet": r[5], "score": r[6], "rank": r[7]} for r in rows]
 
 
 def get_interview(interview_id: int, path: str = DB_PATH) -> Optional[Dict[str, Any]]:
-    conn = sqlite3.connect(path)
-    cur = conn.cursor()
-    cur.execute("SELECT id, role, persona, started_at, ended_at, total_score FROM interviews WHERE id=?", (interview_id,))
-    row = cur.fetchone()
-    conn.close()
+    row = get_connection(path).execute(
+        f"SELECT {_INTERVIEW_COLUMNS} FROM interviews WHERE id=?", (interview_id,)).fetchone()
     if not row:
         return None
-    return dict(id=row[0], role=row[1], persona=row[2], started_at=row[3], ended_at=row[4], total_score=row[5])
+    return _interview_dict(row)
 
 
-def get_answers(interview_id: int, path: str = DB_PATH) -> List[Dict[str, Any]]:
-    conn = sqlite3.connect(path)
-    cur = conn.cursor()
-    cur.execute("SELECT id, question, answer, score, metadata, timestamp FROM answers WHERE interview_id=? ORDER BY id", (interview_id,))
-    rows = cur.fetchall()
-    conn.close()
-    out = []
-    for r in rows:
-        meta = {}
+def get_answers(interview_id: int, path: str = DB_PATH, include_metadata: bool = True) -> List[Dict[str, Any]]:
+    """Answers of one interview in order, with the typed score columns.
+
+    Pass include_metadata=False to skip decoding the JSON metadata blob when only the
+    structured fields are needed.
+    """
+    _flush_writes(path)
+    rows = get_connection(path).execute(_answers_query(include_metadata), (interview_id,)).fetchall()
+    return [_answer_dict(r, include_metadata) for r in rows]
+
+
+def _answers_query(include_metadata: bool = True) -> str:
+    return (f"SELECT id, question, answer, score, {'metadata' if include_metadata else 'NULL'}, timestamp, "
+            f"recommendation, {', '.join(SCORE_COLUMNS)} FROM answers WHERE interview_id=? ORDER BY id")
+
+
+def _answer_dict(r: tuple, include_metadata: bool = True) -> Dict[str, Any]:
+    meta = {}
+    if include_metadata:
         try:
             meta = json.loads(r[4] or "{}")
         except Exception:
             meta = {}
-        out.append({"id": r[0], "question": r[1], "answer": r[2], "score": r[3], "metadata": meta, "timestamp": r[5]})
-    return out
+    item = {"id": r[0], "question": r[1], "answer": r[2], "score": r[3], "metadata": meta, "timestamp": r[5],
+            "recommendation": r[6]}
+    item.update(zip(SCORE_COLUMNS, r[7:]))
+    return item
+
+
+def _check_dimension(dimension: str):
+    if dimension not in SCORE_COLUMNS and dimension != "score":
+        raise ValueError(f"Unknown score dimension {dimension!r}; expected 'score' or one of {SCORE_COLUMNS}")
+
+
+def answer_score_summary(interview_id: int, path: str = DB_PATH) -> Dict[str, Any]:
+    """Average score and per-dimension averages for one interview, computed in SQL.
+
+    Like the report built by Interviewer.end_interview, averages are taken over all
+    answers, with missing values counting as 0.
+    """
+    _flush_writes(path)
+    return _score_summary(get_connection(path).execute(_SCORE_SUMMARY_QUERY, (interview_id,)).fetchone())
+
+
+_SCORE_SUMMARY_QUERY = ("SELECT COUNT(*), "
+                        + ", ".join(f"COALESCE(SUM({c}), 0)" for c in ("score",) + SCORE_COLUMNS)
+                        + " FROM answers WHERE interview_id=?")
+
+
+def _score_summary(row: tuple) -> Dict[str, Any]:
+    count = row[0]
+    n = max(1, count)
+    avgs = [v / n for v in row[1:]]
+    return {
+        "count": count,
+        "avg_score": avgs[0],
+        "breakdown_avg": dict(zip(EVAL_DIMENSIONS, avgs[1:1 + len(EVAL_DIMENSIONS)])),
+        "deep_avg": dict(zip(DEEP_METRICS, avgs[1 + len(EVAL_DIMENSIONS):])),
+    }
+
+
+def dimension_averages(role: str = None, path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Average of every score dimension per role across all stored answers."""
+    _flush_writes(path)
+    where, params = ("WHERE i.role = ?", [role]) if role else ("", [])
+    avgs = ", ".join(f"AVG(a.{c})" for c in ("score",) + SCORE_COLUMNS)
+    rows = get_connection(path).execute(f"""
+        SELECT i.role, COUNT(*), {avgs}
+        FROM answers a JOIN interviews i ON i.id = a.interview_id
+        {where} GROUP BY i.role ORDER BY i.role
+    """, params).fetchall()
+    return [dict(zip(("role", "answers", "score") + SCORE_COLUMNS, r)) for r in rows]
 
 
-def export_interviews_to_excel(path_out: str = "interviews_export.xlsx", db_path: str = DB_PATH) -> str:
-    import pandas as pd
-    ints = list_interviews(path=db_path)
-    all_rows = []
-    for it in ints:
-        answers = get_answers(it["id"], path=db_path)
-        if not answers:
-            all_rows.append({"interview_id": it["id"], "role": it["role"], "persona": it["persona"], "question": None, "answer": None, "score": it.get("total_score", None)})
-        for a in answers:
-            all_rows.append({"interview_id": it["id"], "role": it["role"], "persona": it["persona"], "question": a["question"], "answer": a["answer"], "score": a["score"]})
-    df = pd.DataFrame(all_rows)
-    df.to_excel(path_out, index=False)
+def dimension_leaderboard(dimension: str, role: str = None, limit: int = 10, path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Interviews ranked by their average value of one score dimension, best first."""
+    _check_dimension(dimension)
+    _flush_writes(path)
+    where, params = ("WHERE i.role = ?", [role]) if role else ("", [])
+    rows = get_connection(path).execute(f"""
+        SELECT a.interview_id, i.role, i.persona, AVG(a.{dimension}) AS avg_value, COUNT(a.{dimension})
+        FROM answers a JOIN interviews i ON i.id = a.interview_id
+        {where} GROUP BY a.interview_id HAVING COUNT(a.{dimension}) > 0
+        ORDER BY avg_value DESC LIMIT ?
+    """, params + [limit]).fetchall()
+    return [{"interview_id": r[0], "role": r[1], "persona": r[2], "avg": r[3], "answers": r[4]} for r in rows]
+
+
+def dimension_distribution(dimension: str, bucket_width: float = 5.0, role: str = None,
+                           path: str = DB_PATH) -> List[Dict[str, Any]]:
+    """Histogram of one score dimension over all answers, as (bucket_start, count) rows."""
+    _check_dimension(dimension)
+    _flush_writes(path)
+    where, params = ("AND i.role = ?", [role]) if role else ("", [])
+    rows = get_connection(path).execute(f"""
+        SELECT CAST(a.{dimension} / ? AS INTEGER) * ? AS bucket, COUNT(*)
+        FROM answers a JOIN interviews i ON i.id = a.interview_id
+        WHERE a.{dimension} IS NOT NULL {where}
+        GROUP BY bucket ORDER BY bucket
+    """, [bucket_width, bucket_width] + params).fetchall()
+    return [{"bucket_start": r[0], "count": r[1]} for r in rows]
+
+
+EXPORT_COLUMNS = ["interview_id", "role", "persona", "question", "answer", "score"]
+EXPORT_FORMATS = ("xlsx", "csv", "parquet")
+_EXPORT_QUERY = """
+    SELECT i.id, i.role, i.persona, a.question, a.answer,
+           CASE WHEN a.id IS NULL THEN i.total_score ELSE a.score END
+    FROM interviews i LEFT JOIN answers a ON a.interview_id = i.id
+    ORDER BY i.id DESC, a.id
+"""
+
+
+def iter_export_rows(db_path: str = DB_PATH, batch_size: int = 1000) -> Iterator[List[tuple]]:
+    """Yield export rows (EXPORT_COLUMNS order) in batches from a single LEFT JOIN query.
+
+    Interviews without answers produce one row with the interview's total score, as
+    the original per-interview export did.
+    """
+    _flush_writes(db_path)
+    cur = get_connection(db_path).execute(_EXPORT_QUERY)
+    try:
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cur.close()
+
+
+def export_interviews(path_out: str, fmt: str = None, db_path: str = DB_PATH,
+                      progress: Callable[[int], None] = None, batch_size: int = 1000,
+                      batches: Iterable[List[tuple]] = None) -> str:
+    """Stream every interview/answer row to an xlsx, csv or parquet file in constant memory.
+
+    fmt defaults to the file extension of path_out. progress, if given, is called with
+    the running row count after each batch. batches overrides the row source (storage
+    backends pass their own iter_export_rows).
+    """
+    fmt = (fmt or os.path.splitext(path_out)[1].lstrip(".")).lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {fmt!r}; expected one of {EXPORT_FORMATS}")
+    if batches is None:
+        batches = iter_export_rows(db_path, batch_size)
+    written = 0
+
+    if fmt == "xlsx":
+        from openpyxl import Workbook
+        # write_only workbooks stream rows to disk instead of building the sheet in memory
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet()
+        ws.append(EXPORT_COLUMNS)
+        for rows in batches:
+            for r in rows:
+                ws.append(list(r))
+            written += len(rows)
+            if progress:
+                progress(written)
+        wb.save(path_out)
+    elif fmt == "csv":
+        import csv
+        with open(path_out, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for rows in batches:
+                writer.writerows(rows)
+                written += len(rows)
+                if progress:
+                    progress(written)
+    else:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        schema = pa.schema([("interview_id", pa.int64()), ("role", pa.string()), ("persona", pa.string()),
+                            ("question", pa.string()), ("answer", pa.string()), ("score", pa.float64())])
+        with pq.ParquetWriter(path_out, schema) as writer:
+            for rows in batches:
+                columns = list(zip(*rows))
+                batch = pa.record_batch([pa.array(c, type=f.type) for c, f in zip(columns, schema)], schema=schema)
+                writer.write_table(pa.Table.from_batches([batch]))
+                written += len(rows)
+                if progress:
+                    progress(written)
     return path_out
+
+
+def export_interviews_to_excel(path_out: str = "interviews_export.xlsx", db_path: str = DB_PATH,
+                               progress: Callable[[int], None] = None) -> str:
+    return export_interviews(path_out, "xlsx", db_path=db_path, progress=progress)
+
+
+SNAPSHOT_WATERMARK = "_watermark.json"
+_SNAPSHOT_TABLES = {
+    # Finalized interviews are picked up by end time, answers (append-only) by id
+    "interviews": ("""
+        SELECT ended_at, role, strftime('%Y-%m', started_at, 'unixepoch'),
+               id, persona, started_at, ended_at, total_score, decision, duration, {avgs}
+        FROM interviews WHERE ended_at IS NOT NULL AND ended_at > ? ORDER BY ended_at, id
+    """, [("id", "int64"), ("persona", "string"), ("started_at", "float64"), ("ended_at", "float64"),
+          ("total_score", "float64"), ("decision", "string"), ("duration", "float64")]
+        + [(f"{c}_avg", "float64") for c in EVAL_DIMENSIONS]),
+    "answers": ("""
+        SELECT a.id, i.role, strftime('%Y-%m', a.timestamp, 'unixepoch'),
+               a.id, a.interview_id, a.question, a.answer, a.score, a.timestamp, a.recommendation, {scores}
+        FROM answers a LEFT JOIN interviews i ON i.id = a.interview_id WHERE a.id > ? ORDER BY a.id
+    """, [("id", "int64"), ("interview_id", "int64"), ("question", "string"), ("answer", "string"),
+          ("score", "float64"), ("timestamp", "float64"), ("recommendation", "string")]
+        + [(c, "float64") for c in SCORE_COLUMNS]),
+}
+
+
+def export_snapshot(out_dir: str, db_path: str = DB_PATH, incremental: bool = True, batch_size: int = 5000,
+                    progress: Callable[[str, int], None] = None) -> Dict[str, Any]:
+    """Write interviews and answers (with the flattened evaluation columns) as Parquet.
+
+    Files are hive-partitioned as <out_dir>/<table>/role=<role>/month=<YYYY-MM>/part-*.parquet
+    and streamed from the cursor in Arrow record batches. A watermark file in out_dir
+    remembers the newest row exported; incremental runs only append rows past it, while
+    incremental=False rewrites both tables from scratch. A re-finalized interview appears
+    once per finalization, so readers should keep the row with the latest ended_at.
+    """
+    import shutil
+    from urllib.parse import quote
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(out_dir, exist_ok=True)
+    mark_path = os.path.join(out_dir, SNAPSHOT_WATERMARK)
+    watermark = {"interviews": 0, "answers": 0}
+    if incremental and os.path.exists(mark_path):
+        with open(mark_path, encoding="utf-8") as f:
+            watermark.update(json.load(f))
+    _flush_writes(db_path)
+    # Unique per run so appends never overwrite an earlier part file
+    snapshot_id = time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + f"-{uuid.uuid4().hex[:8]}"
+    counts = {}
+    conn = get_connection(db_path)
+    for table, (query, fields) in _SNAPSHOT_TABLES.items():
+        if not incremental:
+            shutil.rmtree(os.path.join(out_dir, table), ignore_errors=True)
+        schema = pa.schema([(name, getattr(pa, typ)()) for name, typ in fields])
+        writers = {}
+        written = 0
+        cur = conn.execute(query.format(avgs=", ".join(f"{c}_avg" for c in EVAL_DIMENSIONS),
+                                        scores=", ".join(SCORE_COLUMNS)), (watermark[table],))
+        try:
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                parts: Dict[Tuple[str, str], List[tuple]] = {}
+                for r in rows:
+                    parts.setdefault((r[1] or "unknown", r[2] or "unknown"), []).append(r[3:])
+                for (role, month), part_rows in parts.items():
+                    writer = writers.get((role, month))
+                    if writer is None:
+                        part_dir = os.path.join(out_dir, table, f"role={quote(role, safe='')}", f"month={month}")
+                        os.makedirs(part_dir, exist_ok=True)
+                        writer = writers[(role, month)] = pq.ParquetWriter(
+                            os.path.join(part_dir, f"part-{snapshot_id}.parquet"), schema)
+                    columns = list(zip(*part_rows))
+                    batch = pa.record_batch([pa.array(c, type=f.type) for c, f in zip(columns, schema)],
+                                            schema=schema)
+                    writer.write_table(pa.Table.from_batches([batch]))
+                watermark[table] = rows[-1][0]
+                written += len(rows)
+                if progress:
+                    progress(table, written)
+        finally:
+            cur.close()
+            for writer in writers.values():
+                writer.close()
+        counts[table] = written
+    # The watermark only moves once every part file is complete
+    tmp = mark_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(watermark, f)
+    os.replace(tmp, mark_path)
+    return {"rows": counts, "watermark": watermark, "snapshot": snapshot_id}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI Interview Agent database utilities")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="upgrade the schema to the latest version")
+    sub.add_parser("reindex", help="create/backfill the full-text answer search index")
+    p_export = sub.add_parser("export", help="export interviews and answers")
+    p_export.add_argument("out", help="output file (.xlsx, .csv or .parquet)")
+    p_snapshot = sub.add_parser("snapshot", help="partitioned Parquet snapshot for analytics")
+    p_snapshot.add_argument("out_dir", help="snapshot directory")
+    p_snapshot.add_argument("--full", action="store_true", help="rewrite everything instead of appending")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        print(f"schema version {migrate(args.db)}")
+    elif args.command == "reindex":
+        if rebuild_search_index(args.db):
+            print("answer search index rebuilt")
+        else:
+            print("this SQLite build has no FTS5 support; search falls back to LIKE")
+    elif args.command == "export":
+        export_interviews(args.out, db_path=args.db, progress=lambda n: print(f"\r{n} rows", end=""))
+        print(f"\nwrote {args.out}")
+    elif args.command == "snapshot":
+        result = export_snapshot(args.out_dir, db_path=args.db, incremental=not args.full)
+        print(f"appended {result['rows']} to {args.out_dir}")
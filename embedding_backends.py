@@ -0,0 +1,109 @@
+import os
+import re
+import zlib
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from clients import get_client
+
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "auto")
+EMBED_MODEL = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
+LOCAL_EMBED_DIM = int(os.getenv("LOCAL_EMBED_DIM", "1024"))
+
+_WORD = re.compile(r"\w+")
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into vectors. `model` names the vector space and keys caches and indexes."""
+
+    model = ""
+    # Whether results are worth keeping in the embedding cache
+    cacheable = True
+    # Longest input the model accepts, in tokens (None: no limit)
+    max_input_tokens: Optional[int] = None
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        """Embed one batch; results line up with `texts`. Raises if the batch fails."""
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """The OpenAI embeddings endpoint through the shared pooled client."""
+
+    max_input_tokens = int(os.getenv("EMBED_MAX_INPUT_TOKENS", "8191"))
+
+    def __init__(self, api_key: str = None, model: str = None):
+        self.api_key = api_key
+        self.model = model or EMBED_MODEL
+
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        resp = get_client(self.api_key).embeddings.create(model=self.model, input=list(texts))
+        return [np.asarray(d.embedding, dtype=np.float32) for d in sorted(resp.data, key=lambda d: d.index)]
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """Local, CPU-only vectors from hashed word and character n-gram counts.
+
+    Features are hashed into `dim` buckets with a random sign (the hashing trick),
+    weighted by sublinear term frequency and L2-normalized. No vocabulary or corpus
+    statistics are needed, so results are deterministic across processes and
+    similar wording gives high cosine similarity. It measures lexical overlap rather
+    than meaning, and is much weaker than a neural embedding model.
+    """
+
+    cacheable = False
+
+    def __init__(self, dim: int = LOCAL_EMBED_DIM, ngram_range: tuple = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.model = f"local-hash-{dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD.findall(text.lower())
+        feats = ["w:" + w for w in words]
+        lo, hi = self.ngram_range
+        for w in words:
+            padded = f" {w} "
+            for n in range(lo, hi + 1):
+                feats.extend(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+        return feats
+
+    def embed_one(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        feats = self._features(text)
+        if not feats:
+            return vec
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in feats), dtype=np.uint32, count=len(feats))
+        buckets = (hashes % self.dim).astype(np.intp)
+        signs = np.where((hashes >> 31) & 1, -1.0, 1.0).astype(np.float32)
+        np.add.at(vec, buckets, signs)
+        vec = np.sign(vec) * np.log1p(np.abs(vec))
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
+
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        return [self.embed_one(t) for t in texts]
+
+
+def get_embedding_backend(api_key: str = None, name: str = None, model: str = None) -> EmbeddingBackend:
+    """Backend selected by `name` or EMBEDDING_BACKEND: "openai", "local" or "auto".
+
+    "auto" uses OpenAI when an API key is available (argument or OPENAI_API_KEY) and
+    the local hashing backend otherwise. A model name such as "local-hash-512" always
+    selects the local backend with that dimension.
+    """
+    name = (name or EMBEDDING_BACKEND).lower()
+    if model and model.startswith("local-hash-"):
+        return HashingEmbeddingBackend(int(model[len("local-hash-"):]))
+    if name == "local":
+        return HashingEmbeddingBackend()
+    if name == "openai":
+        return OpenAIEmbeddingBackend(api_key, model)
+    if name == "auto":
+        if api_key or os.getenv("OPENAI_API_KEY"):
+            return OpenAIEmbeddingBackend(api_key, model)
+        return HashingEmbeddingBackend()
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {name!r}; expected openai, local or auto")
@@ -1,8 +1,30 @@
 import os
 import json
-from typing import Dict
-from openai import OpenAI
-from prompts import EVALUATION_PROMPT
+import asyncio
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from openai import AsyncOpenAI
+from clients import get_client, get_async_client, run_async
+from prompts import EVALUATION_PROMPT, COMBINED_PROMPT, SYSTEM_PROMPT
+from cache import TieredCache, make_key, CACHE_PATH
+
+
+EVAL_TEMPERATURE = 0.2
+EVAL_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "8"))
+EVAL_TIMEOUT = float(os.getenv("EVAL_TIMEOUT", "30"))
+
+# Evaluations are content-addressed by the rendered prompt, model and temperature,
+# so resubmissions (Streamlit reruns, report regeneration) skip the LLM entirely.
+_eval_cache = TieredCache(
+    "evaluation",
+    max_items=int(os.getenv("EVAL_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("EVAL_CACHE_TTL", "0")) or None,
+    path=os.getenv("EVAL_CACHE_PATH", CACHE_PATH),
+    max_disk_items=int(os.getenv("EVAL_CACHE_DISK_ITEMS", "50000")),
+)
+
+
+def eval_cache_stats() -> Dict:
+    return _eval_cache.stats()
 
 
 def _ensure_key(api_key: str):
@@ -10,7 +32,127 @@ def _ensure_key(api_key: str):
         raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY env var or pass api_key.")
 
 
-def evaluate_answer(question: str, answer: str, role: str, api_key: str, model: str = None) -> Dict:
+def _render_prompt(question: str, answer: str, role: str, combined: bool = False) -> str:
+    template = COMBINED_PROMPT if combined else EVALUATION_PROMPT
+    return template.replace("{{question}}", question).replace("{{answer}}", answer).replace("{{role}}", role)
+
+
+def _request_kwargs(prompt: str, model: str, combined: bool = False) -> Dict:
+    if combined:
+        # One structured-output call carries both the evaluation and the follow-up
+        return dict(
+            model=model,
+            messages=[{"role": "system", "content": SYSTEM_PROMPT},
+                      {"role": "user", "content": prompt}],
+            temperature=EVAL_TEMPERATURE,
+            max_tokens=700,
+            response_format={"type": "json_object"},
+        )
+    return dict(
+        model=model,
+        messages=[{"role": "system", "content": "You are a helpful evaluator."},
+                  {"role": "user", "content": prompt}],
+        temperature=EVAL_TEMPERATURE,
+        max_tokens=600,
+    )
+
+
+def _normalize(data: Dict) -> Dict:
+    # Normalize some fields
+    if "score" in data:
+        data["score"] = float(data["score"])
+    return data
+
+
+def _parse_evaluation(text: str) -> Dict:
+    # Try to parse JSON from the response
+    return _normalize(json.loads(text.strip()))
+
+
+class IncrementalJSONParser:
+    """Extract the top-level fields of a streamed JSON object as soon as each one is complete.
+
+    feed() returns the fields completed by the new chunk; `fields` holds everything seen so
+    far. Text outside the outermost object (e.g. markdown code fences) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.fields: Dict[str, Any] = {}
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        self.buffer += chunk
+        new: Dict[str, Any] = {}
+        buf = self.buffer
+        for i in range(self._pos, len(buf)):
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+            if c == '"':
+                self._in_string = True
+                if self._depth == 1 and self._value_start is None:
+                    self._key_start = i
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                if self._depth == 1:
+                    self._complete(i, new)
+                self._depth -= 1
+            elif self._depth == 1 and c == ":":
+                self._value_start = i + 1
+            elif self._depth == 1 and c == ",":
+                self._complete(i, new)
+        self._pos = len(buf)
+        return new
+
+    def _complete(self, end: int, new: Dict[str, Any]):
+        if self._key is not None and self._value_start is not None:
+            try:
+                value = json.loads(self.buffer[self._value_start:end])
+            except ValueError:
+                value = None
+            else:
+                self.fields[self._key] = value
+                new[self._key] = value
+        self._key = None
+        self._value_start = None
+
+
+def fallback_evaluation(answer: str) -> Dict:
+    """Simple heuristic scoring used locally when the LLM call fails."""
+    relevance = 20 if len(answer.split()) > 10 else 10
+    technical = 20 if any(k in answer.lower() for k in ["design", "optimize", "sql", "api", "model"]) else 12
+    clarity = 20 if len(answer.split('.')) > 1 else 12
+    structure = 20 if any(word in answer.lower() for word in ["situation", "task", "action", "result"]) else 10
+    total = relevance + technical + clarity + structure
+    rec = "Consider" if total > 50 else "Reject"
+    return {
+        "score": float(total),
+        "breakdown": {"relevance": relevance, "technical_depth": technical, "clarity": clarity, "structure": structure},
+        "strengths": ["Provided some technical terms"],
+        "weaknesses": ["Needs clearer structure and more depth"],
+        "recommendation": rec,
+    }
+
+
+def evaluate_answer(question: str, answer: str, role: str, api_key: str, model: str = None,
+                    use_cache: bool = True) -> Dict:
     """Call the LLM to evaluate the answer and return structured evaluation data.
 
     Returns dict:
@@ -21,39 +163,145 @@ def evaluate_answer(question: str, answer: str, role: str, api_key: str, model:
       - recommendation (str)
     """
     _ensure_key(api_key)
-    client = OpenAI(api_key=api_key)
     model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    prompt = _render_prompt(question, answer, role)
 
-    system = EVALUATION_PROMPT
-    prompt = system.replace("{{question}}", question).replace("{{answer}}", answer).replace("{{role}}", role)
+    key = make_key(prompt, model, EVAL_TEMPERATURE)
+    if use_cache:
+        cached = _eval_cache.get(key)
+        if cached is not None:
+            return dict(cached)
 
     try:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "system", "content": "You are a helpful evaluator."},
-                      {"role": "user", "content": prompt}],
-            temperature=0.2,
-            max_tokens=600,
-        )
-        text = resp.choices[0].message.content.strip()
-        # Try to parse JSON from the response
-        data = json.loads(text)
-        # Normalize some fields
-        if "score" in data:
-            data["score"] = float(data["score"])
+        client = get_client(api_key)
+        resp = client.chat.completions.create(**_request_kwargs(prompt, model))
+        data = _parse_evaluation(resp.choices[0].message.content)
+        # Only real LLM results are cached; heuristic fallbacks should be retried
+        _eval_cache.set(key, dict(data))
         return data
     except Exception:
         # Fallback: perform simple heuristic scoring locally if LLM fails
-        relevance = 20 if len(answer.split()) > 10 else 10
-        technical = 20 if any(k in answer.lower() for k in ["design", "optimize", "sql", "api", "model"]) else 12
-        clarity = 20 if len(answer.split('.')) > 1 else 12
-        structure = 20 if any(word in answer.lower() for word in ["situation", "task", "action", "result"]) else 10
-        total = relevance + technical + clarity + structure
-        rec = "Consider" if total > 50 else "Reject"
-        return {
-            "score": float(total),
-            "breakdown": {"relevance": relevance, "technical_depth": technical, "clarity": clarity, "structure": structure},
-            "strengths": ["Provided some technical terms"],
-            "weaknesses": ["Needs clearer structure and more depth"],
-            "recommendation": rec,
-        }
+        return fallback_evaluation(answer)
+
+
+def evaluate_with_followup(question: str, answer: str, role: str, api_key: str, model: str = None,
+                           use_cache: bool = True) -> Tuple[Dict, str]:
+    """Evaluate the answer and generate the follow-up question in a single LLM call.
+
+    Returns (evaluation, follow_up); the evaluation has the same shape as evaluate_answer's
+    result. Sends the question, answer and role once instead of twice per turn.
+    """
+    _ensure_key(api_key)
+    model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    prompt = _render_prompt(question, answer, role, combined=True)
+
+    key = make_key(prompt, model, EVAL_TEMPERATURE)
+    data = _eval_cache.get(key) if use_cache else None
+    if data is None:
+        try:
+            resp = get_client(api_key).chat.completions.create(**_request_kwargs(prompt, model, combined=True))
+            data = _parse_evaluation(resp.choices[0].message.content)
+            _eval_cache.set(key, dict(data))
+        except Exception:
+            return fallback_evaluation(answer), ""
+    data = dict(data)
+    follow_up = data.pop("follow_up", "") or ""
+    return data, str(follow_up)
+
+
+def stream_evaluation(question: str, answer: str, role: str, api_key: str, model: str = None,
+                      use_cache: bool = True, combined: bool = False) -> Iterator[Dict]:
+    """Streaming counterpart of evaluate_answer.
+
+    Yields the fields parsed so far each time a new one completes, so the overall score
+    can be shown before strengths and weaknesses arrive. The last item yielded is the
+    complete evaluation, with the same shape as evaluate_answer's result. With
+    combined=True the COMBINED_PROMPT is used and items also carry "follow_up".
+    """
+    _ensure_key(api_key)
+    model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    prompt = _render_prompt(question, answer, role, combined=combined)
+
+    key = make_key(prompt, model, EVAL_TEMPERATURE)
+    if use_cache:
+        cached = _eval_cache.get(key)
+        if cached is not None:
+            yield dict(cached)
+            return
+
+    parser = IncrementalJSONParser()
+    try:
+        stream = get_client(api_key).chat.completions.create(stream=True, **_request_kwargs(prompt, model, combined))
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta and parser.feed(delta):
+                yield _normalize(dict(parser.fields))
+        try:
+            data = _parse_evaluation(parser.buffer)
+        except ValueError:
+            # Tolerate code fences or trailing chatter around an otherwise complete object
+            if "score" not in parser.fields:
+                raise
+            data = _normalize(dict(parser.fields))
+    except Exception:
+        yield fallback_evaluation(answer)
+        return
+    _eval_cache.set(key, dict(data))
+    yield data
+
+
+async def _evaluate_with_client(client: AsyncOpenAI, question: str, answer: str, role: str, model: str,
+                                use_cache: bool, timeout: float) -> Dict:
+    prompt = _render_prompt(question, answer, role)
+    key = make_key(prompt, model, EVAL_TEMPERATURE)
+    if use_cache:
+        cached = _eval_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+    try:
+        resp = await asyncio.wait_for(client.chat.completions.create(**_request_kwargs(prompt, model)), timeout)
+        data = _parse_evaluation(resp.choices[0].message.content)
+        _eval_cache.set(key, dict(data))
+        return data
+    except Exception:
+        # Timeouts and API errors degrade to the same heuristic as the sync path
+        return fallback_evaluation(answer)
+
+
+async def evaluate_answer_async(question: str, answer: str, role: str, api_key: str, model: str = None,
+                                use_cache: bool = True, timeout: float = EVAL_TIMEOUT) -> Dict:
+    """Asynchronous counterpart of evaluate_answer built on AsyncOpenAI."""
+    _ensure_key(api_key)
+    model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    client = get_async_client(api_key)
+    return await _evaluate_with_client(client, question, answer, role, model, use_cache, timeout)
+
+
+async def evaluate_batch_async(pairs: List[Tuple[str, str]], role: str, api_key: str, model: str = None,
+                               concurrency: int = EVAL_CONCURRENCY, timeout: float = EVAL_TIMEOUT,
+                               use_cache: bool = True) -> List[Dict]:
+    """Evaluate many (question, answer) pairs with at most `concurrency` requests in flight.
+
+    Results are returned in the same order as `pairs`. Each request gets its own
+    timeout and falls back to heuristic scoring independently of the others.
+    """
+    _ensure_key(api_key)
+    model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    client = get_async_client(api_key)
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(question: str, answer: str) -> Dict:
+        async with sem:
+            return await _evaluate_with_client(client, question, answer, role, model, use_cache, timeout)
+
+    return list(await asyncio.gather(*(run(q, a) for q, a in pairs)))
+
+
+def evaluate_batch(pairs: List[Tuple[str, str]], role: str, api_key: str, model: str = None,
+                   concurrency: int = EVAL_CONCURRENCY, timeout: float = EVAL_TIMEOUT,
+                   use_cache: bool = True) -> List[Dict]:
+    """Blocking wrapper around evaluate_batch_async for synchronous callers."""
+    if not pairs:
+        return []
+    return run_async(evaluate_batch_async(pairs, role, api_key, model=model, concurrency=concurrency,
+                                          timeout=timeout, use_cache=use_cache))
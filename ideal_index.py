@@ -0,0 +1,170 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from prompts import QUESTION_TEMPLATES
+from scoring import embed_texts
+from embedding_backends import EmbeddingBackend, get_embedding_backend, EMBED_MODEL
+from similarity import VectorIndex
+
+
+IDEAL_INDEX_PATH = os.getenv("IDEAL_INDEX_PATH", "ideal_index.npz")
+# Seconds to wait before building again after a build produced no vectors (e.g. API outage)
+IDEAL_INDEX_RETRY = float(os.getenv("IDEAL_INDEX_RETRY", "300"))
+
+
+def index_path(model: str, path: str = IDEAL_INDEX_PATH) -> str:
+    """File for the index of `model`: ideal_index.npz -> ideal_index.text-embedding-3-small.npz.
+
+    Each embedding model gets its own file, so processes using different backends do not
+    keep replacing each other's index.
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{re.sub(r'[^A-Za-z0-9_.-]+', '_', model)}{ext or '.npz'}"
+
+
+def question_id(question: str) -> str:
+    """Stable id for a bank question (its text hash), used as the index key."""
+    return hashlib.sha256(question.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def iter_bank(bank: Dict = None) -> Iterator[Tuple[str, str, str]]:
+    """Yield (question_id, question, ideal) for every bank entry that has an ideal answer."""
+    bank = QUESTION_TEMPLATES if bank is None else bank
+    for role in sorted(bank):
+        for section in sorted(bank[role]):
+            for item in bank[role][section]:
+                if isinstance(item, dict) and item.get("q") and item.get("ideal"):
+                    yield question_id(item["q"]), item["q"], item["ideal"]
+
+
+def bank_fingerprint(bank: Dict = None, model: str = EMBED_MODEL) -> str:
+    """Changes whenever a question, an ideal answer or the embedding model changes."""
+    entries = sorted({(qid, ideal) for qid, _, ideal in iter_bank(bank)})
+    return hashlib.sha256(json.dumps([model, entries]).encode("utf-8")).hexdigest()
+
+
+class IdealAnswerIndex:
+    """Embeddings of the question bank's ideal answers, one matrix row per question."""
+
+    def __init__(self, ids: List[str], ideals: List[str], matrix: np.ndarray, model: str, fingerprint: str):
+        self.ids = list(ids)
+        self.ideals = list(ideals)
+        # Rows are kept L2-normalized, so similarity lookups are single matrix products
+        self.vectors = VectorIndex(np.asarray(matrix, dtype=np.float32), self.ids)
+        self.matrix = self.vectors.matrix
+        self.model = model
+        self.fingerprint = fingerprint
+        self._rows = {qid: i for i, qid in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def vector(self, question: str, ideal: str = None) -> Optional[np.ndarray]:
+        """Embedding of the question's ideal answer, or None if it is not indexed.
+
+        Passing `ideal` guards against a caller comparing with a different reference text.
+        """
+        row = self._rows.get(question_id(question))
+        if row is None or (ideal is not None and ideal != self.ideals[row]):
+            return None
+        return self.matrix[row]
+
+    def nearest(self, embedding, k: int = 3) -> List[Tuple[str, float]]:
+        """Bank questions whose ideal answers are closest to `embedding`, as (question_id, cosine)."""
+        return self.vectors.search(embedding, k)
+
+    @classmethod
+    def build(cls, api_key: str = None, model: str = None, bank: Dict = None,
+              backend: EmbeddingBackend = None) -> "IdealAnswerIndex":
+        backend = backend or get_embedding_backend(api_key, model=model)
+        model = backend.model
+        entries = list({qid: (qid, ideal) for qid, _, ideal in iter_bank(bank)}.values())
+        ids, ideals, rows = [], [], []
+        embeddings = embed_texts([ideal for _, ideal in entries], api_key=api_key, backend=backend)
+        for (qid, ideal), emb in zip(entries, embeddings):
+            if emb is None:
+                # Leave it out; deep_evaluate falls back to embedding the ideal on demand
+                continue
+            ids.append(qid)
+            ideals.append(ideal)
+            rows.append(emb)
+        matrix = np.array(rows, dtype=np.float32) if rows else np.zeros((0, 0), dtype=np.float32)
+        return cls(ids, ideals, matrix, model, bank_fingerprint(bank, model))
+
+    def save(self, path: str = IDEAL_INDEX_PATH):
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, matrix=self.matrix, ids=np.array(self.ids, dtype=str),
+                 ideals=np.array(self.ideals, dtype=str), model=np.array(self.model),
+                 fingerprint=np.array(self.fingerprint))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = IDEAL_INDEX_PATH) -> "IdealAnswerIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["ids"].tolist(), data["ideals"].tolist(), data["matrix"],
+                       str(data["model"]), str(data["fingerprint"]))
+
+
+_indexes: Dict[str, IdealAnswerIndex] = {}
+_failed_at: Dict[str, float] = {}
+_index_lock = threading.Lock()
+
+
+def get_ideal_index(api_key: str = None, path: str = IDEAL_INDEX_PATH,
+                    backend: EmbeddingBackend = None) -> Optional[IdealAnswerIndex]:
+    """Return the process-wide index for the embedding backend, loading it on first use.
+
+    The file is index_path(model, path). A missing file, or one built from a different
+    question bank, is rebuilt (ideal answers are embedded in batched requests) and saved.
+    Returns None if there is no usable index; a build that produced nothing is retried
+    after IDEAL_INDEX_RETRY seconds.
+    """
+    backend = backend or get_embedding_backend(api_key)
+    model = backend.model
+    index = _indexes.get(model)
+    if index is not None:
+        return index
+    with _index_lock:
+        if model in _indexes:
+            return _indexes[model]
+        if time.time() - _failed_at.get(model, float("-inf")) < IDEAL_INDEX_RETRY:
+            return None
+        path = index_path(model, path)
+        fingerprint = bank_fingerprint(model=model)
+        try:
+            index = IdealAnswerIndex.load(path) if os.path.exists(path) else None
+            if index is not None and index.fingerprint != fingerprint:
+                index = None
+        except Exception:
+            index = None
+        if index is None:
+            index = IdealAnswerIndex.build(api_key, backend=backend)
+            if not len(index):
+                _failed_at[model] = time.time()
+                return None
+            try:
+                index.save(path)
+            except Exception:
+                pass
+        _failed_at.pop(model, None)
+        _indexes[model] = index
+        return index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the ideal-answer embedding index for the question bank")
+    parser.add_argument("--out", help="output .npz path (default: per-model file next to IDEAL_INDEX_PATH)")
+    args = parser.parse_args()
+    built = IdealAnswerIndex.build(os.getenv("OPENAI_API_KEY"))
+    out = args.out or index_path(built.model)
+    built.save(out)
+    print(f"indexed {len(built)} ideal answers with {built.model} -> {out}")
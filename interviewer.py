@@ -1,28 +1,84 @@
 import os
+import queue
 import random
-from typing import List, Dict
-from openai import OpenAI
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Iterator, List, Dict, Optional, Tuple
+from clients import get_client
 from prompts import QUESTION_TEMPLATES, FOLLOWUP_PROMPT, SYSTEM_PROMPT
-from evaluator import evaluate_answer
+from evaluator import evaluate_answer, evaluate_batch, evaluate_with_followup, fallback_evaluation, stream_evaluation
+
+
+# Combined budget for the LLM work done on each submitted answer
+TURN_TIMEOUT = float(os.getenv("INTERVIEW_TURN_TIMEOUT", "45"))
+# Minimum gap between two speculative turns started from partial answers; a draft that
+# arrives inside the window is kept and started when the window ends
+SPECULATION_DEBOUNCE = float(os.getenv("SPECULATION_DEBOUNCE", "1.5"))
+# A speculative turn only counts as a hit if it started at least this long before submit
+SPECULATION_MIN_LEAD = float(os.getenv("SPECULATION_MIN_LEAD", "0.5"))
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("INTERVIEW_WORKERS", "8")), thread_name_prefix="interviewer")
+# Speculative turns get their own smaller pool so abandoned drafts can never queue ahead
+# of submitted answers
+_speculation_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SPECULATION_WORKERS", "2")),
+                                           thread_name_prefix="speculation")
+
+
+_DONE = object()
+
+
+def _cancel(futures: Tuple[Optional[Future], ...]) -> bool:
+    """Cancel futures that have not started; True if any of them was still queued."""
+    return any([f.cancel() for f in futures if f is not None])
+
+
+def _result_or_none(future: Future):
+    if not future.done() or future.exception() is not None:
+        return None
+    return future.result()
 
 
 class Interviewer:
-    def __init__(self, api_key: str = None, model: str = None):
+    def __init__(self, api_key: str = None, model: str = None, speculative: bool = False, combined: bool = False):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
         self.history: List[Dict] = []
         self.role = None
         self.in_progress = False
         self.queue: List[str] = []
-        self.client = OpenAI(api_key=self.api_key)
+        # Evaluations produced by receive_answer, keyed by (question, answer)
+        self.evaluations: Dict[Tuple[str, str], Dict] = {}
+        # Combined mode gets the evaluation and the follow-up from one LLM call per answer
+        self.combined = combined
+        # Speculative mode starts the next turn's LLM work before the answer is submitted
+        self.speculative = speculative
+        self._speculation: Optional[Dict] = None
+        self._spec_lock = threading.Lock()
+        self._pending_draft: Optional[Tuple[str, str]] = None
+        self._draft_timer: Optional[threading.Timer] = None
+        self.speculation_hits = 0
+        self.speculation_misses = 0
+        # Reused speculative work that started too close to submit to save time
+        self.speculation_late = 0
+        self.speculation_saved_seconds = 0.0
+
+    @property
+    def client(self):
+        # Shared pooled client; resolved lazily so no connection is set up until needed
+        return get_client(self.api_key)
 
     def start_interview(self, role: str):
         self.role = role
         self.in_progress = True
         self.history = []
+        self.evaluations = {}
+        self._drop_speculation()
         self.queue = self._build_question_queue(role)
         first_q = self._pop_next()
         self._append_system(first_q)
+        if self.speculative and self.api_key:
+            # Pre-warm the shared client so the first speculative turn skips connection setup
+            _executor.submit(get_client, self.api_key)
 
     def _append_system(self, text: str):
         self.history.append({"from": "system", "text": text})
@@ -41,19 +97,94 @@ class Interviewer:
     def _pop_next(self) -> str:
         return self.queue.pop(0)["q"] if self.queue else "Thank you. No more questions."
 
+    def _question_before(self, index: int) -> str:
+        """Return the most recent interviewer message preceding history[index]."""
+        for h in reversed(self.history[:index]):
+            if h["from"] == "system":
+                return h["text"]
+        return ""
+
     def receive_answer(self, answer: str) -> Dict:
+        question = self._question_before(len(self.history))
         # Append candidate answer
         self._append_candidate(answer)
 
-        # Evaluate the answer
-        eval_result = evaluate_answer(question=self.history[-2]["text"] if len(self.history) >= 2 else "",
-                                      answer=answer,
-                                      role=self.role or "",
-                                      api_key=self.api_key,
-                                      model=self.model)
+        futures = self._take_speculation(question, answer)
+        eval_result, follow_up = self._run_turn(question, answer, futures)
+        return self._finish_turn(question, answer, eval_result, follow_up)
+
+    def receive_answer_stream(self, answer: str) -> Iterator[Dict]:
+        """Streaming variant of receive_answer.
 
-        # Generate follow-up using LLM
-        follow_up = self._generate_followup(self.history[-2]["text"] if len(self.history) >= 2 else "", answer)
+        Yields events while the evaluation and follow-up stream in concurrently:
+          - {"type": "followup_token", "text": str}
+          - {"type": "evaluation", "data": dict}  (evaluation fields parsed so far)
+          - {"type": "result", "data": dict}      (same as receive_answer's return value)
+        """
+        question = self._question_before(len(self.history))
+        self._append_candidate(answer)
+
+        futures = self._take_speculation(question, answer)
+        if futures:
+            # The speculative turn already did the work; there is nothing left to stream
+            eval_result, follow_up = self._run_turn(question, answer, futures)
+            if follow_up:
+                yield {"type": "followup_token", "text": follow_up}
+            yield {"type": "evaluation", "data": eval_result}
+            yield {"type": "result", "data": self._finish_turn(question, answer, eval_result, follow_up)}
+            return
+
+        events: "queue.Queue" = queue.Queue()
+
+        def pump(kind: str, source: Iterator):
+            try:
+                for item in source:
+                    events.put((kind, item))
+            finally:
+                events.put((kind, _DONE))
+
+        _executor.submit(pump, "evaluation", stream_evaluation(question=question, answer=answer, role=self.role or "",
+                                                               api_key=self.api_key, model=self.model,
+                                                               combined=self.combined))
+        finished = set()
+        if self.combined:
+            # The follow-up arrives as the last field of the combined evaluation stream
+            finished.add("followup_token")
+        else:
+            _executor.submit(pump, "followup_token", self.stream_followup(question, answer))
+        deadline = time.time() + TURN_TIMEOUT
+        eval_result, tokens = None, []
+        while len(finished) < 2:
+            try:
+                kind, item = events.get(timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                break
+            if item is _DONE:
+                finished.add(kind)
+            elif kind == "evaluation":
+                item = dict(item)
+                follow = item.pop("follow_up", None)
+                if follow and not tokens:
+                    tokens.append(str(follow))
+                    yield {"type": "followup_token", "text": str(follow)}
+                eval_result = item
+                yield {"type": "evaluation", "data": item}
+            else:
+                tokens.append(item)
+                yield {"type": "followup_token", "text": item}
+
+        # Anything that did not finish within the turn budget gets the usual fallback
+        if "evaluation" not in finished or eval_result is None:
+            eval_result = fallback_evaluation(answer)
+            if self.combined:
+                tokens = []
+        follow_up = self._clean_followup("".join(tokens)) if "followup_token" in finished else ""
+        self.evaluations[(question, answer)] = eval_result
+        yield {"type": "result", "data": self._finish_turn(question, answer, eval_result, follow_up)}
+
+    def _finish_turn(self, question: str, answer: str, eval_result: Dict, follow_up: str) -> Dict:
+        # The evaluation is already in the ledger: _run_turn and the streaming loop record
+        # it themselves, before a late result can replace it
 
         # Append follow up as next system question or next main question
         if follow_up:
@@ -68,42 +199,206 @@ class Interviewer:
                 "strengths": eval_result.get("strengths", []), "weaknesses": eval_result.get("weaknesses", []),
                 "recommendation": eval_result.get("recommendation", "Consider")}
 
+    def _start_turn(self, question: str, answer: str,
+                    executor: ThreadPoolExecutor = _executor) -> Tuple[Future, Optional[Future]]:
+        if self.combined:
+            # A single future resolving to (evaluation, follow_up)
+            return executor.submit(evaluate_with_followup, question=question, answer=answer, role=self.role or "",
+                                   api_key=self.api_key, model=self.model), None
+        eval_f = executor.submit(evaluate_answer, question=question, answer=answer, role=self.role or "",
+                                 api_key=self.api_key, model=self.model)
+        follow_f = executor.submit(self._generate_followup, question, answer)
+        return eval_f, follow_f
+
+    def _run_turn(self, question: str, answer: str,
+                  futures: Optional[Tuple[Future, Optional[Future]]] = None) -> Tuple[Dict, str]:
+        """Evaluate the answer and generate the follow-up concurrently.
+
+        The turn takes as long as the slower of the two calls, bounded by TURN_TIMEOUT.
+        A failed or late evaluation falls back to heuristic scoring and a failed or
+        late follow-up falls back to the next queued question. `futures` lets a
+        speculative turn that is already running be reused.
+        """
+        eval_f, follow_f = futures or self._start_turn(question, answer)
+        wait([f for f in (eval_f, follow_f) if f is not None], timeout=TURN_TIMEOUT)
+
+        if follow_f is None:
+            eval_result, follow_up = _result_or_none(eval_f) or (None, "")
+            follow_up = self._clean_followup(follow_up)
+        else:
+            eval_result, follow_up = _result_or_none(eval_f), _result_or_none(follow_f) or ""
+        if eval_result is None:
+            eval_result = fallback_evaluation(answer)
+            # Record the heuristic before registering the callback, which can run at once or
+            # from a worker thread; the real evaluation must not be overwritten afterwards
+            self.evaluations[(question, answer)] = eval_result
+            if not eval_f.done():
+                # Let the real evaluation replace the heuristic in the ledger once it lands
+                eval_f.add_done_callback(lambda f: self._record_late_evaluation(question, answer, f))
+        else:
+            self.evaluations[(question, answer)] = eval_result
+        return eval_result, follow_up
+
+    def speculate(self, partial_answer: str):
+        """Start evaluating a (possibly partial) answer to the current question in the background.
+
+        Meant to be called from a UI hook such as a text area's on_change. At most one
+        speculative turn starts per SPECULATION_DEBOUNCE window; drafts arriving inside
+        the window replace each other and the newest one starts when it ends. If the
+        submitted answer matches, receive_answer reuses the running work instead of
+        starting its own LLM calls.
+        """
+        answer = (partial_answer or "").strip()
+        if not (self.speculative and self.in_progress and self.api_key and answer):
+            return
+        question = self._question_before(len(self.history))
+        with self._spec_lock:
+            spec = self._speculation
+            if spec and spec["question"] == question and spec["answer"] == answer:
+                self._pending_draft = None
+                return
+            wait_for = 0.0
+            if spec and spec["question"] == question:
+                wait_for = SPECULATION_DEBOUNCE - (time.time() - spec["started_at"])
+            if wait_for <= 0:
+                self._pending_draft = None
+                self._start_speculation(question, answer)
+                return
+            self._pending_draft = (question, answer)
+            if self._draft_timer is None:
+                self._draft_timer = threading.Timer(wait_for, self._start_pending_draft)
+                self._draft_timer.daemon = True
+                self._draft_timer.start()
+
+    def _start_speculation(self, question: str, answer: str):
+        # Called with _spec_lock held. Only the newest draft matters, so a replaced one
+        # gives up its place in the queue
+        if self._speculation is not None:
+            _cancel(self._speculation["futures"])
+        self._speculation = {"question": question, "answer": answer, "combined": self.combined,
+                             "started_at": time.time(),
+                             "futures": self._start_turn(question, answer, _speculation_executor)}
+
+    def _start_pending_draft(self):
+        with self._spec_lock:
+            self._draft_timer = None
+            draft, self._pending_draft = self._pending_draft, None
+            if draft and self.in_progress and draft[0] == self._question_before(len(self.history)):
+                self._start_speculation(*draft)
+
+    def _drop_speculation(self) -> Optional[Dict]:
+        with self._spec_lock:
+            if self._draft_timer is not None:
+                self._draft_timer.cancel()
+                self._draft_timer = None
+            self._pending_draft = None
+            spec, self._speculation = self._speculation, None
+            return spec
+
+    def _take_speculation(self, question: str, answer: str) -> Optional[Tuple[Future, Future]]:
+        spec = self._drop_speculation()
+        if not self.speculative:
+            if spec:
+                _cancel(spec["futures"])
+            return None
+        if (spec and spec["question"] == question and spec["answer"] == answer.strip()
+                and spec["combined"] == self.combined):
+            if _cancel(spec["futures"]):
+                # Still waiting for a speculation worker: run the turn on the main pool instead
+                self.speculation_late += 1
+                return None
+            # Work started in the submitting rerun itself saves nothing; reuse it but don't count a hit
+            lead = time.time() - spec["started_at"]
+            if lead >= SPECULATION_MIN_LEAD:
+                self.speculation_hits += 1
+                self.speculation_saved_seconds += lead
+            else:
+                self.speculation_late += 1
+            return spec["futures"]
+        if spec:
+            _cancel(spec["futures"])
+        self.speculation_misses += 1
+        return None
+
+    def speculation_stats(self) -> Dict:
+        total = self.speculation_hits + self.speculation_misses + self.speculation_late
+        return {"hits": self.speculation_hits, "misses": self.speculation_misses, "late": self.speculation_late,
+                "hit_rate": (self.speculation_hits / total) if total else 0.0,
+                "saved_seconds": self.speculation_saved_seconds}
+
+    def _record_late_evaluation(self, question: str, answer: str, future: Future):
+        result = _result_or_none(future)
+        if isinstance(result, tuple):
+            result = result[0]
+        if result is not None:
+            self.evaluations[(question, answer)] = result
+
+    def _followup_request(self, question: str, answer: str) -> Dict:
+        prompt = FOLLOWUP_PROMPT.format(question=question, answer=answer, role=self.role)
+        return dict(
+            model=self.model,
+            messages=[{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=100,
+        )
+
+    @staticmethod
+    def _clean_followup(text: str) -> str:
+        follow = (text or "").strip()
+        # If the follow-up is empty or too similar to question, skip
+        if not follow or len(follow) < 10:
+            return ""
+        return follow
+
     def _generate_followup(self, question: str, answer: str) -> str:
         if not self.api_key:
             return ""
-        prompt = FOLLOWUP_PROMPT.format(question=question, answer=answer, role=self.role)
         try:
-            resp = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=100,
-            )
-            follow = resp.choices[0].message.content.strip()
-            # If the follow-up is empty or too similar to question, skip
-            if not follow or len(follow) < 10:
-                return ""
-            return follow
+            resp = self.client.chat.completions.create(**self._followup_request(question, answer))
+            return self._clean_followup(resp.choices[0].message.content)
         except Exception:
             return ""
 
-    def end_interview(self) -> Dict:
-        # Summarize results and provide final report
-        # Aggregate evaluations from history: for simplicity, call evaluate on each candidate response
-        candidate_answers = [h for h in self.history if h["from"] == "candidate"]
+    def stream_followup(self, question: str, answer: str) -> Iterator[str]:
+        """Yield the follow-up question token by token as the completion streams in."""
+        if not self.api_key:
+            return
+        try:
+            stream = self.client.chat.completions.create(stream=True, **self._followup_request(question, answer))
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except Exception:
+            return
+
+    def end_interview(self, reevaluate: bool = False) -> Dict:
+        """Summarize results and provide the final report.
+
+        Evaluations recorded by receive_answer are reused; answers are only sent
+        to the LLM again when missing from the ledger or when reevaluate=True.
+        """
+        candidate_answers = [(self._question_before(i), h["text"]) for i, h in enumerate(self.history)
+                             if h["from"] == "candidate"]
+        pending = [qa for qa in dict.fromkeys(candidate_answers) if reevaluate or qa not in self.evaluations]
+        if pending:
+            # Score everything that is missing in one concurrent batch instead of serially
+            results = evaluate_batch(pending, role=self.role or "", api_key=self.api_key, model=self.model,
+                                     use_cache=not reevaluate)
+            self.evaluations.update(zip(pending, results))
+
         total = 0.0
         breakdown_acc = {"relevance": 0.0, "technical_depth": 0.0, "clarity": 0.0, "structure": 0.0}
         items = []
-        for idx, ca in enumerate(candidate_answers):
-            q = self.history[2*idx]["text"] if 2*idx < len(self.history) else ""
-            res = evaluate_answer(question=q, answer=ca["text"], role=self.role or "", api_key=self.api_key, model=self.model)
+        for q, a in candidate_answers:
+            res = self.evaluations[(q, a)]
             score = res.get("score", 0.0)
             total += score
             bd = res.get("breakdown", {})
             for k in breakdown_acc:
                 # handle naming differences
                 breakdown_acc[k] += bd.get(k, bd.get(k.replace('technical_depth','technical_depth'), 0))
-            items.append({"question": q, "answer": ca["text"], "evaluation": res})
+            items.append({"question": q, "answer": a, "evaluation": res})
 
         count = max(1, len(candidate_answers))
         avg = total / count
@@ -0,0 +1,191 @@
+import os
+import json
+import time
+import gzip
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from db import DB_PATH, get_connection, transaction, migrate, bump_generation, _flush_writes
+
+
+RETENTION_DAYS = float(os.getenv("MAINTENANCE_RETENTION_DAYS", "180"))
+ARCHIVE_PATH = os.getenv("MAINTENANCE_ARCHIVE_PATH", "ai_interviews_archive.jsonl.zst")
+ARCHIVE_BATCH_SIZE = int(os.getenv("MAINTENANCE_BATCH_SIZE", "200"))
+SQLITE_ARCHIVE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+def db_size(path: str = DB_PATH) -> int:
+    """Bytes on disk for the database file plus its WAL."""
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def _open_jsonl(path: str) -> Tuple[Any, str]:
+    """Open a compressed JSONL archive for appending; returns (binary stream, actual path).
+
+    .zst uses zstandard when installed and falls back to gzip (.gz) otherwise. Both
+    formats allow appending: each run adds a new frame/member to the same file.
+    """
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            path = path[:-len(".zst")] + ".gz"
+        else:
+            raw = open(path, "ab")
+            return zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True), path
+    if path.endswith(".gz"):
+        return gzip.open(path, "ab"), path
+    return open(path, "ab"), path
+
+
+def _columns(conn: sqlite3.Connection, table: str, schema: str = "main") -> List[str]:
+    return [r[1] for r in conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()]
+
+
+def _old_interview_ids(conn: sqlite3.Connection, cutoff: float, limit: int) -> List[int]:
+    rows = conn.execute("SELECT id FROM interviews WHERE started_at < ? ORDER BY id LIMIT ?",
+                        (cutoff, limit)).fetchall()
+    return [r[0] for r in rows]
+
+
+def _delete_interviews(cur: sqlite3.Cursor, ids: List[int]) -> int:
+    # The answers_fts triggers remove the deleted answers from the search index
+    marks = ",".join("?" * len(ids))
+    cur.execute(f"DELETE FROM answers WHERE interview_id IN ({marks})", ids)
+    deleted = cur.rowcount
+    cur.execute(f"DELETE FROM interviews WHERE id IN ({marks})", ids)
+    return deleted
+
+
+def archive_interviews(cutoff: float, archive_path: str = ARCHIVE_PATH, db_path: str = DB_PATH,
+                       batch_size: int = ARCHIVE_BATCH_SIZE) -> Dict[str, Any]:
+    """Move interviews started before `cutoff` (epoch seconds), with their answers, out of the hot tables.
+
+    archive_path selects the format by extension: .db/.sqlite gets an SQLite database
+    with the same schema (queryable with db.py); .jsonl.zst/.jsonl.gz gets one compressed
+    JSON line per interview with its answers nested. Work is done in small batches,
+    each in its own short transaction, so the app can keep writing meanwhile. Rows are
+    only deleted after they are in the archive; a crash in between can at worst archive
+    a JSONL batch twice. interview_daily_summary is kept as history.
+    """
+    _flush_writes(db_path)
+    # Both files must be on the same schema version for the column lists to match
+    migrate(db_path)
+    conn = get_connection(db_path)
+    interviews = answers = 0
+    if archive_path.endswith(SQLITE_ARCHIVE_EXTENSIONS):
+        migrate(archive_path)
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+        try:
+            int_cols = ", ".join(_columns(conn, "interviews"))
+            ans_cols = ", ".join(_columns(conn, "answers"))
+            while True:
+                ids = _old_interview_ids(conn, cutoff, batch_size)
+                if not ids:
+                    break
+                marks = ",".join("?" * len(ids))
+                with transaction(db_path) as cur:
+                    # OR IGNORE makes a rerun after a partial failure idempotent
+                    cur.execute(f"INSERT OR IGNORE INTO archive.interviews ({int_cols}) "
+                                f"SELECT {int_cols} FROM main.interviews WHERE id IN ({marks})", ids)
+                    cur.execute(f"INSERT OR IGNORE INTO archive.answers ({ans_cols}) "
+                                f"SELECT {ans_cols} FROM main.answers WHERE interview_id IN ({marks})", ids)
+                    answers += _delete_interviews(cur, ids)
+                interviews += len(ids)
+                bump_generation(db_path)
+        finally:
+            conn.execute("DETACH DATABASE archive")
+    else:
+        stream, archive_path = _open_jsonl(archive_path)
+        try:
+            int_cols = _columns(conn, "interviews")
+            ans_cols = _columns(conn, "answers")
+            while True:
+                ids = _old_interview_ids(conn, cutoff, batch_size)
+                if not ids:
+                    break
+                marks = ",".join("?" * len(ids))
+                nested: Dict[int, List[Dict]] = {i: [] for i in ids}
+                for r in conn.execute(f"SELECT {', '.join(ans_cols)} FROM answers WHERE interview_id IN ({marks}) "
+                                      "ORDER BY id", ids):
+                    item = dict(zip(ans_cols, r))
+                    nested[item["interview_id"]].append(item)
+                for r in conn.execute(f"SELECT {', '.join(int_cols)} FROM interviews WHERE id IN ({marks}) "
+                                      "ORDER BY id", ids):
+                    record = dict(zip(int_cols, r))
+                    record["answers"] = nested[record["id"]]
+                    stream.write((json.dumps(record) + "\n").encode("utf-8"))
+                stream.flush()
+                with transaction(db_path) as cur:
+                    answers += _delete_interviews(cur, ids)
+                interviews += len(ids)
+                bump_generation(db_path)
+        finally:
+            stream.close()
+    return {"archive": archive_path, "interviews": interviews, "answers": answers}
+
+
+def compact(db_path: str = DB_PATH, full_vacuum: bool = False) -> Dict[str, Any]:
+    """Checkpoint the WAL and return free pages to the filesystem.
+
+    Files created by db.py use auto_vacuum=INCREMENTAL, so this only runs
+    incremental_vacuum and never rewrites the file. Older files cannot release pages
+    that way; full_vacuum=True converts them with a one-time VACUUM, which rewrites the
+    whole database and blocks writers, so run it in a quiet period.
+    """
+    conn = get_connection(db_path)
+    before = db_size(db_path)
+    free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    incremental = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    if full_vacuum:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        incremental = True
+    elif incremental:
+        conn.execute("PRAGMA incremental_vacuum").fetchall()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+    after = db_size(db_path)
+    return {"bytes_before": before, "bytes_after": after, "reclaimed_bytes": before - after,
+            "free_pages": free_pages, "full_vacuum": full_vacuum, "incremental": incremental}
+
+
+def run_maintenance(older_than_days: float = RETENTION_DAYS, archive_path: Optional[str] = ARCHIVE_PATH,
+                    db_path: str = DB_PATH, batch_size: int = ARCHIVE_BATCH_SIZE,
+                    full_vacuum: bool = False) -> Dict[str, Any]:
+    """Archive interviews older than `older_than_days` (skipped when archive_path is None), then compact."""
+    report: Dict[str, Any] = {"bytes_before": db_size(db_path)}
+    if archive_path:
+        cutoff = time.time() - older_than_days * 86400
+        report["archived"] = archive_interviews(cutoff, archive_path, db_path, batch_size)
+    report["compaction"] = compact(db_path, full_vacuum)
+    report["reclaimed_bytes"] = report["bytes_before"] - db_size(db_path)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive old interviews and compact the database")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    parser.add_argument("--older-than-days", type=float, default=RETENTION_DAYS,
+                        help="archive interviews started more than this many days ago")
+    parser.add_argument("--archive", default=ARCHIVE_PATH,
+                        help="archive file: .jsonl.zst / .jsonl.gz, or .db for an SQLite archive")
+    parser.add_argument("--compact-only", action="store_true", help="skip archival, only checkpoint and vacuum")
+    parser.add_argument("--full-vacuum", action="store_true",
+                        help="rewrite the file with VACUUM, switching older databases to incremental vacuum")
+    args = parser.parse_args()
+
+    result = run_maintenance(args.older_than_days, None if args.compact_only else args.archive, args.db,
+                             full_vacuum=args.full_vacuum)
+    if "archived" in result:
+        a = result["archived"]
+        print(f"archived {a['interviews']} interviews / {a['answers']} answers to {a['archive']}")
+    c = result["compaction"]
+    mode = "full VACUUM" if c["full_vacuum"] else ("incremental vacuum" if c["incremental"] else "checkpoint")
+    print(f"{mode}: {result['bytes_before']} -> {result['bytes_before'] - result['reclaimed_bytes']} bytes "
+          f"({result['reclaimed_bytes']} reclaimed)")
+    if not c["incremental"] and c["free_pages"]:
+        print(f"{c['free_pages']} free pages kept: this database predates incremental vacuum; "
+              "run once with --full-vacuum to convert it")
@@ -1,35 +1,172 @@
 import os
-import json
-import math
-import openai
-from typing import Dict
+import hashlib
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from cache import TieredCache, make_key, CACHE_PATH
+from embedding_backends import EmbeddingBackend, get_embedding_backend
+import similarity
 
 
-def embed_text(text: str, api_key: str = None, model: str = None):
-    if api_key:
-        openai.api_key = api_key
-    model = model or os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small")
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+# Estimated input tokens per embeddings request (the API caps the total per request)
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "100000"))
+
+
+def _encode_vector(vec: np.ndarray) -> bytes:
+    return np.asarray(vec, dtype=np.float32).tobytes()
+
+
+def _decode_vector(blob: bytes) -> np.ndarray:
+    # frombuffer views are read-only, like the vectors handed out from memory
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+# Embeddings are deterministic per (model, text), so they never need to expire by default
+_embed_cache = TieredCache(
+    "embedding",
+    max_items=int(os.getenv("EMBED_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("EMBED_CACHE_TTL", "0")) or None,
+    path=os.getenv("EMBED_CACHE_PATH", CACHE_PATH),
+    max_disk_items=int(os.getenv("EMBED_CACHE_DISK_ITEMS", "20000")),
+    encode=_encode_vector,
+    decode=_decode_vector,
+)
+
+
+def embed_cache_stats() -> Dict:
+    return _embed_cache.stats()
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def embedding_key(text: str, model: str) -> str:
+    return make_key(model, hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest())
+
+
+def embed_text(text: str, api_key: str = None, model: str = None, use_cache: bool = True,
+               backend: EmbeddingBackend = None) -> Optional[np.ndarray]:
+    """Embedding of `text` as a read-only float32 vector, or None if the request fails.
+
+    Results are cached by (model, hash of the whitespace-normalized text) in memory and
+    in the shared SQLite cache file. backend defaults to get_embedding_backend(api_key).
+    """
+    return embed_texts([text], api_key=api_key, model=model, use_cache=use_cache, backend=backend)[0]
+
+
+def _estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English text; only used to size batches
+    return len(text) // 4 + 1
+
+
+def _truncate(text: str, max_tokens: Optional[int]) -> str:
+    # Cut at ~3 characters per token, below the _estimate_tokens ratio, so dense text
+    # (code, numbers) stays under the limit too; anything still too long is isolated
+    # by _embed_chunk
+    return text if max_tokens is None else text[:max_tokens * 3]
+
+
+def _is_input_error(exc: Exception) -> bool:
+    # The API answers 400 when an input is invalid (e.g. over the token limit); network
+    # errors, rate limits and 5xx would fail the same way for every text
+    return isinstance(exc, ValueError) or getattr(exc, "status_code", None) == 400
+
+
+def _embed_chunk(backend: EmbeddingBackend, texts: List[str]) -> List[Optional[np.ndarray]]:
+    """backend.embed for one request; a rejected request is split in halves and retried,
+    so only the offending texts come back as None."""
     try:
-        resp = openai.Embedding.create(model=model, input=text)
-        return resp["data"][0]["embedding"]
-    except Exception:
-        return None
+        return list(backend.embed(texts))
+    except Exception as exc:
+        if len(texts) == 1 or not _is_input_error(exc):
+            return [None] * len(texts)
+    mid = len(texts) // 2
+    return _embed_chunk(backend, texts[:mid]) + _embed_chunk(backend, texts[mid:])
+
+
+def _chunks(pending: List[tuple], batch_size: int, batch_tokens: int):
+    chunk, tokens = [], 0
+    for item in pending:
+        cost = _estimate_tokens(item[1])
+        if chunk and (len(chunk) >= batch_size or tokens + cost > batch_tokens):
+            yield chunk
+            chunk, tokens = [], 0
+        chunk.append(item)
+        tokens += cost
+    if chunk:
+        yield chunk
+
+
+def embed_texts(texts: Sequence[str], api_key: str = None, model: str = None, use_cache: bool = True,
+                batch_size: int = EMBED_BATCH_SIZE, batch_tokens: int = EMBED_BATCH_TOKENS,
+                backend: EmbeddingBackend = None) -> List[Optional[np.ndarray]]:
+    """Embed many texts with as few API requests as possible.
+
+    Results line up with `texts`. Cached texts are served from the cache, duplicates
+    are embedded once, and the rest are sent in requests of at most batch_size inputs
+    and roughly batch_tokens estimated tokens. Texts longer than the backend's
+    max_input_tokens are truncated. Empty texts come back as None, as do the texts of a
+    request that failed; when the API rejects an input, only that text is lost.
+    """
+    backend = backend or get_embedding_backend(api_key, model=model)
+    model = backend.model
+    use_cache = use_cache and backend.cacheable
+    results: List[Optional[np.ndarray]] = [None] * len(texts)
+    positions: Dict[str, List[int]] = {}
+    pending = []
+    for i, text in enumerate(texts):
+        if not text or not text.strip():
+            continue
+        key = embedding_key(text, model)
+        if key in positions:
+            positions[key].append(i)
+            continue
+        positions[key] = [i]
+        cached = _embed_cache.get(key) if use_cache else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append((key, _truncate(text, backend.max_input_tokens)))
+    for chunk in _chunks(pending, max(1, batch_size), batch_tokens):
+        vectors = _embed_chunk(backend, [text for _, text in chunk])
+        for (key, _), vec in zip(chunk, vectors):
+            if vec is None:
+                continue
+            vec = np.asarray(vec, dtype=np.float32)
+            vec.setflags(write=False)
+            if backend.cacheable:
+                _embed_cache.set(key, vec)
+            results[positions[key][0]] = vec
+    for indexes in positions.values():
+        for i in indexes[1:]:
+            results[i] = results[indexes[0]]
+    return results
+
+
+def warm_embedding_cache(api_key: str = None, model: str = None, bank: Dict = None,
+                         backend: EmbeddingBackend = None) -> Dict:
+    """Embed every ideal answer in the question bank ahead of the first interview.
+
+    Returns the cache stats afterwards; texts that are already cached cost nothing.
+    """
+    if bank is None:
+        from prompts import QUESTION_TEMPLATES as bank
+    ideals = [item["ideal"] for sections in bank.values() for items in sections.values() for item in items
+              if isinstance(item, dict) and item.get("ideal")]
+    embed_texts(ideals, api_key=api_key, model=model, backend=backend)
+    return embed_cache_stats()
 
 
 def cosine(a, b):
-    if not a or not b:
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    mag_a = math.sqrt(sum(x * x for x in a))
-    mag_b = math.sqrt(sum(y * y for y in b))
-    if mag_a == 0 or mag_b == 0:
-        return 0.0
-    return dot / (mag_a * mag_b)
+    # Vectorized in similarity.py; kept here for existing callers
+    return similarity.cosine(a, b)
 
 
 def deep_evaluate(question: str, answer: str, ideal_answer: str = None, api_key: str = None) -> Dict:
     """Return a rich evaluation object with grammar, reasoning, explanation depth, behavioral traits, consistency.
-    Uses embeddings to compare with ideal answer when available.
+    Uses embeddings to compare with ideal answer when available; without an API key the
+    local hashing backend is used (see embedding_backends.get_embedding_backend).
     """
     # Basic heuristics
     words = len(answer.split())
@@ -39,13 +176,20 @@ def deep_evaluate(question: str, answer: str, ideal_answer: str = None, api_key:
     behavioral_traits = {"ownership": 50, "teamwork": 50, "leadership": 40}
     consistency = 80
 
-    # If ideal answer provided and API available, compute semantic similarity
+    # If ideal answer provided, compute semantic similarity
     try:
-        if ideal_answer and api_key:
-            emb_ans = embed_text(answer, api_key=api_key)
-            emb_ideal = embed_text(ideal_answer, api_key=api_key)
-            if emb_ans and emb_ideal:
-                sim = cosine(emb_ans, emb_ideal)
+        if ideal_answer:
+            from ideal_index import get_ideal_index
+            backend = get_embedding_backend(api_key)
+            # Bank ideals are embedded once and served from the persisted index
+            index = get_ideal_index(api_key, backend=backend)
+            emb_ideal = index.vector(question, ideal_answer) if index is not None else None
+            if emb_ideal is None:
+                emb_ideal = embed_text(ideal_answer, api_key=api_key, backend=backend)
+            emb_ans = embed_text(answer, api_key=api_key, backend=backend)
+            if emb_ans is not None and emb_ideal is not None:
+                # Signed hashed features can give small negative values for unrelated texts
+                sim = max(0.0, cosine(emb_ans, emb_ideal))
                 # map similarity to scores
                 reasoning = min(100, int(sim * 100))
                 explanation_depth = min(100, int((words / 200.0) * 100) + int(sim * 50))
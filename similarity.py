@@ -0,0 +1,80 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def as_matrix(vectors) -> np.ndarray:
+    """2-D float32 view of one vector or a sequence of vectors."""
+    m = np.asarray(vectors, dtype=np.float32)
+    return m.reshape(1, -1) if m.ndim == 1 else m
+
+
+def normalize(vectors) -> np.ndarray:
+    """L2-normalize rows so cosine similarity becomes a plain dot product. Zero rows stay zero."""
+    m = as_matrix(vectors)
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return np.divide(m, norms, out=np.zeros_like(m), where=norms > 0)
+
+
+def cosine(a, b) -> float:
+    if a is None or b is None or len(a) == 0 or len(b) == 0:
+        return 0.0
+    return float(normalize(a)[0] @ normalize(b)[0])
+
+
+def cosine_one_to_many(query, matrix, normalized: bool = False) -> np.ndarray:
+    """Cosine of one vector against every row of `matrix` (one matrix-vector product).
+
+    Pass normalized=True when both inputs are already unit rows.
+    """
+    q = as_matrix(query)[0] if normalized else normalize(query)[0]
+    m = as_matrix(matrix) if normalized else normalize(matrix)
+    return m @ q
+
+
+def cosine_many_to_many(a, b, normalized: bool = False) -> np.ndarray:
+    """Pairwise cosine matrix of shape (len(a), len(b))."""
+    if not normalized:
+        a, b = normalize(a), normalize(b)
+    return as_matrix(a) @ as_matrix(b).T
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first (last axis for 2-D input)."""
+    scores = np.asarray(scores)
+    n = scores.shape[-1]
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.zeros(scores.shape[:-1] + (0,), dtype=np.intp)
+    # argpartition is O(n); only the k survivors get sorted
+    part = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(part, order, axis=-1)
+
+
+class VectorIndex:
+    """Pre-normalized float32 reference vectors for repeated cosine lookups."""
+
+    def __init__(self, vectors, ids: Optional[Sequence[Any]] = None):
+        self.matrix = normalize(vectors) if len(vectors) else np.zeros((0, 0), dtype=np.float32)
+        self.ids = list(ids) if ids is not None else list(range(len(self.matrix)))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def similarities(self, query) -> np.ndarray:
+        if not len(self):
+            return np.zeros(0, dtype=np.float32)
+        return cosine_one_to_many(normalize(query), self.matrix, normalized=True)
+
+    def search(self, query, k: int = 5) -> List[Tuple[Any, float]]:
+        """The k most similar references as (id, cosine), best first."""
+        scores = self.similarities(query)
+        return [(self.ids[i], float(scores[i])) for i in top_k(scores, k)]
+
+    def search_many(self, queries, k: int = 5) -> List[List[Tuple[Any, float]]]:
+        """search() for a batch of queries with a single matrix product."""
+        if not len(self):
+            return [[] for _ in range(len(queries))]
+        scores = cosine_many_to_many(normalize(queries), self.matrix, normalized=True)
+        return [[(self.ids[i], float(row[i])) for i in idx] for row, idx in zip(scores, top_k(scores, k))]
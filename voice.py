@@ -1,7 +1,7 @@
 import os
 import tempfile
-import openai
 import pyttsx3
+from clients import get_client
 
 def tts_speak(text: str):
     try:
@@ -15,8 +15,6 @@ def tts_speak(text: str):
 
 def stt_from_file(fileobj, api_key: str = None, model: str = None) -> str:
     """Try to transcribe audio file using OpenAI Whisper (if available). fileobj is a file-like object."""
-    if api_key:
-        openai.api_key = api_key
     model = model or os.getenv("OPENAI_WHISPER_MODEL", "whisper-1")
     try:
         # Save to temp file
@@ -25,15 +23,7 @@ def stt_from_file(fileobj, api_key: str = None, model: str = None) -> str:
             tmp.flush()
             tmp_filename = tmp.name
         with open(tmp_filename, "rb") as audio_file:
-            # The exact function name may vary; try common one
-            try:
-                resp = openai.Audio.transcribe(model=model, file=audio_file)
-                return resp.get("text", "")
-            except Exception:
-                try:
-                    resp = openai.Whisper.transcribe(model=model, file=audio_file)
-                    return resp.get("text", "")
-                except Exception:
-                    return ""
+            resp = get_client(api_key).audio.transcriptions.create(model=model, file=audio_file)
+            return resp.text or ""
     except Exception:
         return ""